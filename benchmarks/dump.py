@@ -0,0 +1,70 @@
+"""Measure the peak memory and time of writing a TaskDB to disk.
+
+Compares rendering the whole document with `dumps` before writing it against
+the streaming `dump`, on all the shipped task files loaded into one TaskDB.
+Run from the repository root:
+
+    PYTHONPATH=. python benchmarks/dump.py
+"""
+import io
+import os
+import glob
+import gzip
+import tempfile
+import time
+import tracemalloc
+
+from sota_extractor import serialization
+from sota_extractor.consts import Format
+from sota_extractor.taskdb import TaskDB
+
+# Formats written by rendering a single JSON document.
+FORMATS = [Format.json, Format.json_gz]
+
+
+def dump_whole(tdb: TaskDB, output: str, fmt: Format):
+    if fmt == Format.json:
+        with io.open(output, mode="w", encoding="utf-8") as fp:
+            fp.write(serialization.dumps(tdb))
+    elif fmt == Format.json_gz:
+        with gzip.open(output, mode="wb") as fp:
+            fp.write(serialization.dumps(tdb).encode("utf-8"))
+    else:
+        raise ValueError(f"Unsupported format: {fmt.value}")
+
+
+def measure(func, *args):
+    """Get the peak traced memory in bytes and the time in seconds."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    func(*args)
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak, seconds
+
+
+def main():
+    tdb = TaskDB()
+    for filename in sorted(glob.glob("data/tasks/*.json")):
+        tdb.load_tasks(filename)
+
+    print(f"{'format':<8} {'':<10} {'peak [KiB]':>12} {'time [ms]':>10}")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for fmt in FORMATS:
+            output = os.path.join(tmpdir, f"tasks.{fmt.value}")
+            # warm up, so that imports and caches are not counted below
+            serialization.dump(tdb, output, fmt=fmt)
+            for label, func in [
+                ("whole", dump_whole),
+                ("streaming", serialization.dump),
+            ]:
+                peak, seconds = measure(func, tdb, output, fmt)
+                print(
+                    f"{fmt.value:<8} {label:<10} {peak / 1024:>12.0f} "
+                    f"{seconds * 1000:>10.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Benchmark dumping and loading the TaskDB in every serialization format.
+
+All the shipped task files are merged into one TaskDB, dumped in every format
+and loaded back into a new TaskDB with `TaskDB.load_tasks`. A mapped file is
+loaded with the rows of its tables still in the file, open it with
+`MappedTaskDB` to keep everything there. Formats whose optional compression
+package is not installed are skipped. Run from the repository root:
+
+    PYTHONPATH=. python benchmarks/formats.py
+"""
+import os
+import glob
+import tempfile
+import timeit
+
+from sota_extractor import serialization
+from sota_extractor.consts import Format
+from sota_extractor.errors import UnsupportedFormat
+from sota_extractor.taskdb import TaskDB
+
+
+def best_of(func, repeat=5) -> float:
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def main():
+    tdb = TaskDB()
+    for filename in sorted(glob.glob("data/tasks/*.json")):
+        tdb.load_tasks(filename)
+
+    print(f"{len(tdb.tasks)} tasks")
+    print(
+        f"{'format':<10} {'size [KiB]':>12} {'dump [ms]':>10} "
+        f"{'load [ms]':>10}"
+    )
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for fmt in Format:
+            filename = os.path.join(tmpdir, f"tasks.{fmt.value}")
+            try:
+                dump = best_of(lambda: serialization.dump(tdb, filename, fmt))
+            except UnsupportedFormat as e:
+                print(f"{fmt.value:<10} skipped: {e.message}")
+                continue
+            load = best_of(
+                lambda: TaskDB().load_tasks(
+                    data=serialization.load(filename, fmt=fmt)
+                )
+            )
+            size = os.path.getsize(filename)
+            print(
+                f"{fmt.value:<10} {size / 1024:>12.0f} {dump * 1000:>10.1f} "
+                f"{load * 1000:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Benchmark getting a few tasks out of a task file.
+
+Compares loading the whole JSON file into a TaskDB against a LazyTaskDB over
+the same tasks written as JSON Lines, which parses only the requested tasks.
+Run from the repository root:
+
+    PYTHONPATH=. python benchmarks/lazy_tasks.py
+"""
+import os
+import glob
+import tempfile
+import timeit
+
+from sota_extractor import serialization
+from sota_extractor.consts import Format
+from sota_extractor.taskdb import LazyTaskDB, TaskDB
+
+NAMES = ["Question Answering", "Machine Translation", "Image Classification"]
+
+# Formats loaded whole into a TaskDB and formats opened with a LazyTaskDB.
+FULL_FORMATS = [Format.json, Format.json_gz]
+LAZY_FORMATS = [Format.jsonl, Format.jsonl_gz]
+
+
+def best_of(func, repeat=5) -> float:
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def get_tasks(tdb: TaskDB):
+    return [tdb.get_task(name) for name in NAMES]
+
+
+def main():
+    tdb = TaskDB()
+    for filename in sorted(glob.glob("data/tasks/*.json")):
+        tdb.load_tasks(filename)
+
+    print(f"{len(tdb.tasks)} tasks, getting {len(NAMES)}")
+    print(f"{'format':<10} {'size [KiB]':>12} {'time [ms]':>10}")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for fmt in FULL_FORMATS + LAZY_FORMATS:
+            filename = os.path.join(tmpdir, f"tasks.{fmt.value}")
+            serialization.dump(tdb, filename, fmt=fmt)
+            if fmt in FULL_FORMATS:
+
+                def func():
+                    full = TaskDB()
+                    full.load_tasks(
+                        data=serialization.load(filename, fmt=fmt)
+                    )
+                    return get_tasks(full)
+
+            else:
+
+                def func():
+                    return get_tasks(LazyTaskDB(filename))
+
+            size = os.path.getsize(filename)
+            print(
+                f"{fmt.value:<10} {size / 1024:>12.0f} "
+                f"{best_of(func) * 1000:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
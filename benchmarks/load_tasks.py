@@ -0,0 +1,39 @@
+"""Benchmark TaskDB.load_tasks with and without schema validation.
+
+Run from the repository root, with the package installed or on the path:
+
+    PYTHONPATH=. python benchmarks/load_tasks.py
+"""
+import glob
+import timeit
+
+from marshmallow import ValidationError
+
+from sota_extractor import serialization
+from sota_extractor.taskdb import TaskDB
+
+
+def best_of(func, repeat=5) -> float:
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def main():
+    print(f"{'file':<32} {'fast [ms]':>10} {'validated [ms]':>15} {'x':>6}")
+    for filename in sorted(glob.glob("data/tasks/*.json")):
+        data = serialization.load(filename)
+        fast = best_of(lambda: TaskDB().load_tasks(data=data))
+        try:
+            validated = best_of(
+                lambda: TaskDB().load_tasks(data=data, validate=True)
+            )
+        except ValidationError:
+            print(f"{filename:<32} {fast * 1000:>10.1f} {'invalid':>15}")
+            continue
+        print(
+            f"{filename:<32} {fast * 1000:>10.1f} {validated * 1000:>15.1f} "
+            f"{validated / fast:>6.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
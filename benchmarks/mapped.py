@@ -0,0 +1,109 @@
+"""Measure the memory a forked worker copies when serving a few tasks.
+
+A parent process loads copies of all the shipped task files, either into a
+TaskDB from JSON or as a MappedTaskDB, and forks a worker that gets a few
+tasks, reads all their rows and runs the garbage collector, as a long running
+worker eventually does. The private dirty memory of the worker is the memory
+it could not share with the parent, "none" is the interpreter alone. Linux
+only. Run from the repository root:
+
+    PYTHONPATH=. python benchmarks/mapped.py
+"""
+import os
+import gc
+import sys
+import glob
+import tempfile
+import subprocess
+
+from sota_extractor import serialization
+from sota_extractor.consts import Format
+from sota_extractor.taskdb import MappedTaskDB, TaskDB
+
+NAMES = ["Question Answering", "Machine Translation", "Image Classification"]
+
+# Number of copies of the shipped tasks.
+COPIES = 20
+
+
+def private_dirty() -> int:
+    """Get the private dirty memory of this process in bytes."""
+    with open("/proc/self/smaps_rollup") as fp:
+        for line in fp:
+            if line.startswith("Private_Dirty:"):
+                return int(line.split()[1]) * 1024
+    raise RuntimeError("No Private_Dirty in smaps_rollup.")
+
+
+def serve(tdb):
+    for name in NAMES if tdb is not None else []:
+        task = tdb.get_task(name)
+        for dataset in task.datasets:
+            for row in dataset.sota.rows:
+                row.metrics.items()
+    # the cyclic garbage collector touches every tracked object
+    gc.collect()
+
+
+def worker_memory(tdb) -> int:
+    """Fork a worker serving the tasks and get its copied memory."""
+    read, write = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read)
+        before = private_dirty()
+        serve(tdb)
+        os.write(write, str(private_dirty() - before).encode())
+        os._exit(0)
+    os.close(write)
+    with os.fdopen(read) as fp:
+        size = int(fp.read())
+    os.waitpid(pid, 0)
+    return size
+
+
+def load(kind: str, filename: str):
+    if kind == "none":
+        return None
+    if kind == "mapped":
+        return MappedTaskDB(filename)
+    tdb = TaskDB()
+    tdb.load_tasks(data=serialization.load(filename, fmt=Format(kind)))
+    return tdb
+
+
+def main():
+    if len(sys.argv) == 3:
+        # in a fresh process, so the other kind of TaskDB is not in memory
+        print(worker_memory(load(*sys.argv[1:])))
+        return
+
+    # the shipped tasks are small, copy them to get the size of a merged DB
+    tdb = TaskDB()
+    for filename in sorted(glob.glob("data/tasks/*.json")):
+        data = serialization.load(filename)
+        for i in range(COPIES):
+            for task in data:
+                name = f"{task['task']} {i}" if i else task["task"]
+                tdb.load_tasks(data=[dict(task, task=name)])
+
+    print(f"{'':<8} {'file [KiB]':>12} {'copied per worker [KiB]':>24}")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for kind in ["none", "json", "mapped"]:
+            filename = os.path.join(tmpdir, f"tasks.{kind}")
+            if kind != "none":
+                serialization.dump(tdb, filename, fmt=Format(kind))
+            output = subprocess.run(
+                [sys.executable, __file__, kind, filename],
+                check=True,
+                capture_output=True,
+            ).stdout
+            size = os.path.getsize(filename) if kind != "none" else 0
+            print(
+                f"{kind:<8} {size / 1024:>12.0f} "
+                f"{int(output) / 1024:>24.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
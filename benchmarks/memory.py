@@ -0,0 +1,99 @@
+"""Measure the memory taken by a loaded TaskDB per sota row.
+
+Compares the slotted models with interned strings against plain dataclasses
+with an instance dict and no interning, on the shipped task files. Run from
+the repository root:
+
+    PYTHONPATH=. python benchmarks/memory.py
+"""
+import contextlib
+import dataclasses
+import glob
+import json
+import tracemalloc
+
+from sota_extractor.taskdb import TaskDB
+from sota_extractor.taskdb.v01 import loader, models
+
+MODELS = ("Link", "SotaRow", "Sota", "Dataset", "Task")
+
+
+def plain(cls):
+    """Copy a model as a dataclass with an instance dict."""
+    return dataclasses.make_dataclass(
+        cls.__name__,
+        [
+            (
+                f.name,
+                f.type,
+                dataclasses.field(
+                    default=f.default, default_factory=f.default_factory
+                ),
+            )
+            for f in dataclasses.fields(cls)
+        ],
+    )
+
+
+def count_rows(tdb: TaskDB) -> int:
+    def dataset_rows(dataset):
+        return len(dataset.sota.rows) + sum(
+            dataset_rows(d) for d in dataset.subdatasets
+        )
+
+    def task_rows(task):
+        return sum(dataset_rows(d) for d in task.datasets) + sum(
+            task_rows(t) for t in task.subtasks
+        )
+
+    return sum(task_rows(task) for task in tdb.tasks.values())
+
+
+def measure(filenames):
+    """Load the files and get the retained bytes and the number of rows."""
+    tracemalloc.start()
+    tdb = TaskDB()
+    for filename in filenames:
+        with open(filename) as fp:
+            tdb.load_tasks(data=json.load(fp))
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size, count_rows(tdb)
+
+
+@contextlib.contextmanager
+def plain_models():
+    """Load tasks into dataclasses with an instance dict, not interned."""
+    originals = {name: getattr(loader, name) for name in MODELS}
+    original_intern = loader.TaskLoader.intern
+    try:
+        for name in MODELS:
+            setattr(loader, name, plain(getattr(models, name)))
+        loader.TaskLoader.intern = lambda self, value: value
+        yield
+    finally:
+        for name, cls in originals.items():
+            setattr(loader, name, cls)
+        loader.TaskLoader.intern = original_intern
+
+
+def main():
+    filenames = sorted(glob.glob("data/tasks/*.json"))
+    with plain_models():
+        # warm up, so that imports and caches are not counted below
+        measure(filenames)
+        before, _ = measure(filenames)
+    after, rows = measure(filenames)
+
+    print(f"{len(filenames)} files, {rows} sota rows")
+    print(f"{'':<24} {'total [KiB]':>12} {'per row [B]':>12}")
+    for label, size in [
+        ("dict, not interned", before),
+        ("slotted, interned", after),
+    ]:
+        print(f"{label:<24} {size / 1024:>12.0f} {size / rows:>12.0f}")
+    print(f"saved {1 - after / before:.0%}")
+
+
+if __name__ == "__main__":
+    main()
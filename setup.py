@@ -24,6 +24,7 @@ setup(
     license="Apache-2.0",
     packages=find_packages(),
     install_requires=io.open("requirements.txt").read().splitlines(),
+    extras_require={"zstd": ["zstandard>=0.15"], "lz4": ["lz4>=2.1"]},
     include_package_data=True,
     scripts=[],
     entry_points="""
@@ -1,37 +1,142 @@
 import re
+import sys
+import time
 import click
+import logging
+import multiprocessing
 import pandas as pd
-from typing import List, Dict
+from typing import (
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    Dict,
+    Optional,
+    Tuple,
+)
 from nltk.stem.porter import PorterStemmer
 from sota_extractor import serialization
+from sota_extractor.consts import CACHE_DIR
 from sota_extractor.commands.cli import cli
-from sota_extractor.errors import catch_errors
+from sota_extractor.errors import ArgumentError, DataError, catch_errors
+from sota_extractor.evaluation import CorpusCache
+from sota_extractor.evaluation.matchers import (
+    DEFAULT_MATCHER,
+    MATCHERS,
+    Matcher,
+    contains_sota,
+    get_matcher,
+)
 from sota_extractor.taskdb.v01 import Task, TaskDB
 
 
-def load(tdb):
-    # load the tasks and arxiv metadata
-    stemmer = PorterStemmer()
+logger = logging.getLogger(__name__)
 
-    tdb.load_tasks("data/tasks/nlpprogress.json")
-    tdb.load_synonyms(["data/tasks/synonyms.csv"])
-    arxiv = serialization.load(
-        "data/arxiv_aclweb.json.gz", fmt=serialization.Format.json_gz
-    )
 
-    for a in arxiv:
+ARXIV_FILE = "data/arxiv_aclweb.json.gz"
+
+stemmer = PorterStemmer()
+
+# Fields derived from the normalized papers, computed only when needed. Every
+# feature maps to a function computing it and the features it depends on,
+# which have to be declared before it.
+FEATURES: Dict[str, Tuple[Callable[[Dict], Any], Tuple[str, ...]]] = {
+    "title_lower": (lambda a: a["title"].lower(), ()),
+    "abstract_lower": (lambda a: a["abstract"].lower(), ()),
+    "contains_sota": (
+        lambda a: contains_sota(a["abstract_lower"]),
+        ("abstract_lower",),
+    ),
+    "title_stem": (lambda a: stemmer.stem(a["title"]), ()),
+    "abstract_stem": (lambda a: stemmer.stem(a["abstract"]), ()),
+}
+
+# Features used by `eval_task`.
+EVAL_FEATURES = ("title_lower",)
+
+
+def resolve_features(features: Iterable[str]) -> List[str]:
+    """Get the features together with their dependencies, in FEATURES order.
+
+    Raises:
+        ArgumentError: If any of the features is unknown.
+    """
+    required = set()
+    pending = list(features)
+    while pending:
+        feature = pending.pop()
+        if feature not in FEATURES:
+            raise ArgumentError(f"Unknown paper feature: {feature}")
+        if feature not in required:
+            required.add(feature)
+            pending.extend(FEATURES[feature][1])
+    return [feature for feature in FEATURES if feature in required]
+
+
+def add_features(papers: List[Dict], features: Iterable[str]) -> List[str]:
+    """Compute the features missing from the papers.
+
+    Returns:
+        The names of the features that were computed.
+    """
+    missing = [
+        feature
+        for feature in resolve_features(features)
+        if any(feature not in a for a in papers)
+    ]
+    for a in papers:
+        for feature in missing:
+            if feature not in a:
+                a[feature] = FEATURES[feature][0](a)
+    return missing
+
+
+def normalize(papers: Iterable[Dict]) -> Iterator[Dict]:
+    """Filter the papers and normalize their titles and abstracts."""
+    for a in papers:
+        # require and normalise arxiv titles
+        if "title" not in a or a["title"] is None:
+            continue
         if a["abstract"] is None:
             a["abstract"] = ""
 
-    # require and normalise arxiv titles
-    arxiv = [a for a in arxiv if "title" in a and a["title"] is not None]
-    for a in arxiv:
+        # raw arxiv api response, not used in the evaluation
+        a.pop("json", None)
+
         a["title"] = re.sub(" +", " ", a["title"].replace("\n", " "))
-        a["title_lower"] = a["title"].lower()
-        a["abstract_lower"] = a["abstract"].lower()
-        a["title_stem"] = stemmer.stem(a["title"])
-        a["abstract_stem"] = stemmer.stem(a["abstract"])
+        yield a
+
+
+def load(tdb, cache_dir=None, features=MATCHERS[DEFAULT_MATCHER].features):
+    """Load the tasks and the normalized arxiv papers.
 
+    Args:
+        tdb (TaskDB): TaskDB into which the tasks are loaded.
+        cache_dir (str): Preprocessed corpus cache directory, the cache is
+            not used if not set.
+        features: Derived paper fields required by the matcher.
+    """
+    tdb.load_tasks("data/tasks/nlpprogress.json")
+    tdb.load_synonyms(["data/tasks/synonyms.csv"])
+
+    cache = CorpusCache(cache_dir) if cache_dir else None
+    arxiv = cache.get(ARXIV_FILE) if cache is not None else None
+    cached = arxiv is not None
+    if not cached:
+        # stream the papers to avoid holding the raw corpus in memory
+        arxiv = list(
+            normalize(
+                serialization.iter_load(
+                    ARXIV_FILE, fmt=serialization.Format.json_gz
+                )
+            )
+        )
+
+    computed = add_features(arxiv, EVAL_FEATURES + tuple(features))
+    if cache is not None and (computed or not cached):
+        # store the corpus together with the newly computed features
+        cache.put(ARXIV_FILE, arxiv)
     return arxiv
 
 
@@ -49,107 +154,244 @@ def eval_task(predicted: List[Dict], task: Task):
         for sd in d.subdatasets:
             all_sota.extend(sd.sota.rows)
 
-    # true positives
-    tp = []
-    tp_sota = []
-    for p in predicted:
-        for s in all_sota:
-            if (
-                p["arxiv_id"] and s.paper_url and p["arxiv_id"] in s.paper_url
-            ) or (
-                p["title_lower"]
-                and s.paper_title
-                and p["title_lower"] == s.paper_title.lower()
-            ):
-                tp.append(p)
-                tp_sota.append(s)
-
-    fn = [s for s in all_sota if s not in tp_sota]
-    fp = [p for p in predicted if p not in tp]
+    # index the predictions by arxiv id and by lowercased title
+    by_arxiv_id: Dict[str, List[int]] = {}
+    by_title: Dict[str, List[int]] = {}
+    for i, p in enumerate(predicted):
+        if p["arxiv_id"]:
+            by_arxiv_id.setdefault(p["arxiv_id"], []).append(i)
+        if p["title_lower"]:
+            by_title.setdefault(p["title_lower"], []).append(i)
+    id_lengths = {len(arxiv_id) for arxiv_id in by_arxiv_id}
+
+    # true positives, as (prediction, sota row) index pairs. A prediction
+    # matches a row if its arxiv id is contained in the paper url, so every
+    # url substring with the length of an arxiv id is looked up.
+    pairs = []
+    for j, s in enumerate(all_sota):
+        matched = set()
+        if s.paper_url:
+            url = s.paper_url
+            for length in id_lengths:
+                for start in range(len(url) - length + 1):
+                    matched.update(
+                        by_arxiv_id.get(url[start : start + length], ())
+                    )
+        if s.paper_title:
+            matched.update(by_title.get(s.paper_title.lower(), ()))
+        pairs.extend((i, j) for i in matched)
+    pairs.sort()
+
+    tp = [predicted[i] for i, _ in pairs]
+    tp_idx = {i for i, _ in pairs}
+    tp_sota_idx = {j for _, j in pairs}
+
+    fn = [s for j, s in enumerate(all_sota) if j not in tp_sota_idx]
+    fp = [p for i, p in enumerate(predicted) if i not in tp_idx]
 
     return tp, fn, fp
 
 
-def article_matches(paper: Dict, task: Task):
-    """Check if a paper mentions the tasks.
+def eval_row(task: Task, arxiv: List[Dict], matcher: Matcher) -> Dict:
+    """Evaluate a single task and return its report row."""
+    pred = matcher.match(arxiv, task)
+    tp, fn, fp = eval_task(pred, task)
 
-    By mentioning it in the title or abstract.
-    And also mentioning state-of-the-art.
-    """
+    prec = 0
+    recal = 0
+    if (len(tp) + len(fp)) != 0:
+        prec = len(tp) / (len(tp) + len(fp))
+    if len(tp) / (len(tp) + len(fn)) != 0:
+        recal = len(tp) / (len(tp) + len(fn))
 
-    title = paper["title_lower"]
-    abstract = paper["abstract_lower"]
+    parent = ""
+    if task.parent:
+        parent = task.parent.name
 
-    all_task_names = [task.name]
-    all_task_names.extend(task.synonyms)
+    return {
+        "task": task.name,
+        "parent": parent,
+        "tp": len(tp),
+        "fn": len(fn),
+        "fp": len(fp),
+        "precision": round(prec, 2),
+        "recall": round(recal, 2),
+    }
 
-    matches_paper = False
-    for task_name in all_task_names:
-        task_name_lower = task_name.lower()
-        matches_paper = matches_paper or task_name_lower in title
-        matches_paper = matches_paper or task_name_lower in abstract
 
-    contains_sota = (
-        "state-of-the-art" in abstract
-        or "state-of-art" in abstract
-        or "state of the art" in abstract
-        or "state of art" in abstract
-        or "sota" in abstract
-    )
+# State shared with the worker processes. It is set before the pool is
+# forked, so the workers inherit the corpus and the prepared matcher instead
+# of getting them pickled with every task.
+_shared: Dict[str, Any] = {}
+
+
+def _eval_shared_row(i: int) -> Dict:
+    return eval_row(_shared["tasks"][i], _shared["arxiv"], _shared["matcher"])
+
 
-    return matches_paper and contains_sota
+def eval_rows(
+    tasks: List[Task], arxiv: List[Dict], matcher: Matcher, jobs: int = 1
+) -> List[Dict]:
+    """Evaluate the tasks, optionally in parallel.
 
+    Args:
+        tasks: Tasks to evaluate.
+        arxiv: Papers to predict from.
+        matcher: Matcher prepared for the papers and tasks.
+        jobs: Number of worker processes.
 
-def eval_all(tdb, arxiv, output):
+    Returns:
+        Report rows in the same order as the tasks.
+    """
+    if jobs > 1:
+        try:
+            context = multiprocessing.get_context("fork")
+        except ValueError:
+            logger.warning("Fork not supported, evaluating in one process.")
+            jobs = 1
+
+    if jobs <= 1 or len(tasks) <= 1:
+        return [eval_row(task, arxiv, matcher) for task in tasks]
+
+    _shared.update(tasks=tasks, arxiv=arxiv, matcher=matcher)
+    try:
+        with context.Pool(min(jobs, len(tasks))) as pool:
+            return pool.map(_eval_shared_row, range(len(tasks)))
+    finally:
+        _shared.clear()
+
+
+REPORT_COLUMNS = ["task", "parent", "tp", "fn", "fp", "precision", "recall"]
+METRIC_COLUMNS = ["tp", "fn", "fp", "precision", "recall"]
+
+
+def report(rows: List[Dict]) -> pd.DataFrame:
+    """Build the evaluation report with a total row from task rows."""
+    # The report used to be grown with DataFrame.append, which left float
+    # columns for the metrics whose first value was a float and kept the
+    # python values (and their csv formatting) in all other columns.
+    df = pd.DataFrame(rows, columns=REPORT_COLUMNS, dtype=object)
+    for column in METRIC_COLUMNS:
+        if rows and isinstance(rows[0][column], float):
+            df[column] = df[column].astype(float)
+
+    means = df[METRIC_COLUMNS].astype(float).mean().round(2)
+    total = {"task": "", "parent": "Total"}
+    total.update(means.to_dict())
+    df.loc[len(df)] = [total[column] for column in REPORT_COLUMNS]
+    return df
+
+
+def eval_all(tdb, arxiv, output, jobs=1, matcher=None):
     sota_tasks = tdb.tasks_with_sota()
 
-    df = pd.DataFrame(
-        columns=["task", "parent", "tp", "fn", "fp", "precision", "recall"]
-    )
+    matcher = matcher or get_matcher(DEFAULT_MATCHER)
+    matcher.prepare(arxiv, sota_tasks)
+    df = report(eval_rows(sota_tasks, arxiv, matcher, jobs=jobs))
 
-    for task in sota_tasks:
-        pred = [a for a in arxiv if article_matches(a, task)]
-        tp, fn, fp = eval_task(pred, task)
+    click.echo(f"Writing report into: {output}")
+    df.to_csv(output)
 
-        prec = 0
-        recal = 0
-        if (len(tp) + len(fp)) != 0:
-            prec = len(tp) / (len(tp) + len(fp))
-        if len(tp) / (len(tp) + len(fn)) != 0:
-            recal = len(tp) / (len(tp) + len(fn))
 
-        parent = ""
-        if task.parent:
-            parent = task.parent.name
+def peak_rss() -> Optional[int]:
+    """Get the peak resident set size of the process in bytes.
 
-        df = df.append(
-            {
-                "task": task.name,
-                "parent": parent,
-                "tp": len(tp),
-                "fn": len(fn),
-                "fp": len(fp),
-                "precision": round(prec, 2),
-                "recall": round(recal, 2),
-            },
-            ignore_index=True,
-        )
+    Returns:
+        The peak RSS or None if it is not available, e.g. on Windows.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    # linux reports kilobytes, macos bytes
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def bench_matcher(tdb, arxiv, name, jobs=1) -> Dict[str, Any]:
+    """Run the evaluation with a matcher and measure it.
+
+    Returns:
+        Dictionary with the matcher name, the wall time in seconds, the peak
+        RSS in bytes (None if not available), the number of papers matched
+        against all the tasks per second and the evaluation report.
+    """
+    sota_tasks = tdb.tasks_with_sota()
+    matcher = get_matcher(name)
 
-    df = df.append(
-        {
-            "task": "",
-            "parent": "Total",
-            "tp": round(df["tp"].mean(), 2),
-            "fn": round(df["fn"].mean(), 2),
-            "fp": round(df["fp"].mean(), 2),
-            "precision": round(df["precision"].mean(), 2),
-            "recall": round(df["recall"].mean(), 2),
-        },
-        ignore_index=True,
-    )
+    start = time.perf_counter()
+    matcher.prepare(arxiv, sota_tasks)
+    rows = eval_rows(sota_tasks, arxiv, matcher, jobs=jobs)
+    seconds = time.perf_counter() - start
+
+    return {
+        "matcher": name,
+        "seconds": seconds,
+        "peak_rss": peak_rss(),
+        "papers_per_second": len(arxiv) / seconds if seconds else 0.0,
+        "report": report(rows),
+    }
+
+
+def _bench_child(conn, tdb, arxiv, name, jobs):
+    try:
+        conn.send(bench_matcher(tdb, arxiv, name, jobs=jobs))
+    finally:
+        conn.close()
 
-    click.echo(f"Writing report into: {output}")
-    df.to_csv(output)
+
+def bench_matchers(tdb, arxiv, names, jobs=1) -> List[Dict[str, Any]]:
+    """Benchmark the matchers one after the other.
+
+    Every matcher runs in its own forked process, when fork is supported, so
+    its peak RSS is not affected by the matchers before it.
+    """
+    try:
+        context = multiprocessing.get_context("fork")
+    except ValueError:
+        return [bench_matcher(tdb, arxiv, name, jobs=jobs) for name in names]
+
+    results = []
+    for name in names:
+        parent_conn, child_conn = context.Pipe(duplex=False)
+        process = context.Process(
+            target=_bench_child, args=(child_conn, tdb, arxiv, name, jobs)
+        )
+        process.start()
+        child_conn.close()
+        try:
+            results.append(parent_conn.recv())
+        except EOFError:
+            raise DataError(f"Benchmark of the {name} matcher failed.")
+        finally:
+            process.join()
+    return results
+
+
+def print_bench(results: List[Dict[str, Any]]):
+    for result in results:
+        click.secho(f"Matcher: {result['matcher']}", bold=True)
+        click.echo(result["report"].to_string())
+        click.echo()
+
+    summary = pd.DataFrame(
+        [
+            {
+                "matcher": result["matcher"],
+                "wall time [s]": round(result["seconds"], 3),
+                "peak RSS [MB]": (
+                    None
+                    if result["peak_rss"] is None
+                    else round(result["peak_rss"] / 2 ** 20, 1)
+                ),
+                "papers/s": round(result["papers_per_second"]),
+                "precision": result["report"]["precision"].iloc[-1],
+                "recall": result["report"]["recall"].iloc[-1],
+            }
+            for result in results
+        ]
+    )
+    click.echo(summary.to_string(index=False))
 
 
 @cli.command()
@@ -161,9 +403,57 @@ def eval_all(tdb, arxiv, output):
     default="data/eval_all_report.csv",
     help="Output filename to use.",
 )
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=1,
+    help="Number of tasks to evaluate in parallel.",
+)
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False),
+    default=CACHE_DIR,
+    help="Directory for the preprocessed arxiv corpus cache.",
+)
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    default=False,
+    help="Preprocess the arxiv corpus without using the cache.",
+)
+@click.option(
+    "-m",
+    "--matcher",
+    "matchers",
+    type=click.Choice(list(MATCHERS)),
+    multiple=True,
+    help=f"Matcher predicting the papers of a task [default: "
+    f"{DEFAULT_MATCHER}], can be repeated with --bench.",
+)
+@click.option(
+    "--bench",
+    is_flag=True,
+    default=False,
+    help="Benchmark the matchers (all by default) instead of writing the "
+    "report.",
+)
 @catch_errors
-def evaluate(output):
+def evaluate(output, jobs, cache_dir, no_cache, matchers, bench):
     """Evaluate."""
+    if not matchers:
+        matchers = list(MATCHERS) if bench else [DEFAULT_MATCHER]
+    elif len(matchers) > 1 and not bench:
+        raise ArgumentError("Only one matcher can be used without --bench.")
+
+    features = {f for name in matchers for f in MATCHERS[name].features}
+
     tdb = TaskDB()
-    arxiv = load(tdb)
-    eval_all(tdb, arxiv, output)
+    arxiv = load(
+        tdb, cache_dir=None if no_cache else cache_dir, features=features
+    )
+    if bench:
+        print_bench(bench_matchers(tdb, arxiv, matchers, jobs=jobs))
+    else:
+        matcher = get_matcher(matchers[0])
+        eval_all(tdb, arxiv, output, jobs=jobs, matcher=matcher)
@@ -1,9 +1,14 @@
+import sys
+import time
+
 import click
 from sota_extractor import scrapers
-from sota_extractor.consts import Format
+from sota_extractor.consts import Format, CACHE_DIR, NLP_PROGRESS_REPO
 from sota_extractor import serialization
 from sota_extractor.commands.cli import cli
-from sota_extractor.errors import catch_errors
+from sota_extractor.errors import ArgumentError, catch_errors
+from sota_extractor.scrapers.runner import SOURCES, SourceResult, scrape_all
+from sota_extractor.scrapers.utils import DEFAULT_TIMEOUT
 
 
 @cli.command()
@@ -132,7 +137,142 @@ def cityscapes(output, fmt):
     default=Format.json,
     help="Output format.",
 )
+@click.option(
+    "--repo",
+    default=NLP_PROGRESS_REPO,
+    show_default=True,
+    help="NLP Progress repository url or path to a local repository.",
+)
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False),
+    default=CACHE_DIR,
+    help="Directory for the repository checkout and the parsed files.",
+)
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    default=False,
+    help="Clone the repository and parse all the files.",
+)
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=1,
+    help="Number of markdown files to parse in parallel.",
+)
 @catch_errors
-def nlp_progress(output, fmt):
+def nlp_progress(output, fmt, repo, cache_dir, no_cache, jobs):
     """Extract NLP Progress SOTA tables."""
-    serialization.dump(tdb=scrapers.nlp_progress(), output=output, fmt=fmt)
+    serialization.dump(
+        tdb=scrapers.nlp_progress(
+            repo=repo, cache_dir=None if no_cache else cache_dir, jobs=jobs
+        ),
+        output=output,
+        fmt=fmt,
+    )
+
+
+def parse_timeouts(values):
+    """Parse the NAME=SECONDS source timeouts."""
+    timeouts = {}
+    for value in values:
+        name, _, seconds = value.partition("=")
+        try:
+            timeouts[name] = float(seconds)
+        except ValueError:
+            raise ArgumentError(
+                f"Invalid source timeout: {value}, use NAME=SECONDS."
+            )
+    return timeouts
+
+
+def print_result(result: SourceResult):
+    if result.ok:
+        click.echo(
+            f"{result.name:<14} {'ok':<7} {result.seconds:>7.2f}s  "
+            f"{result.output}"
+        )
+    else:
+        click.secho(
+            f"{result.name:<14} {'failed':<7} {result.seconds:>7.2f}s  "
+            f"{result.error}",
+            fg="red",
+        )
+
+
+@cli.command("scrape-all")
+@click.option(
+    "-d",
+    "--output-dir",
+    type=click.Path(file_okay=False),
+    default="data/tasks",
+    show_default=True,
+    help="Directory of the output files.",
+)
+@click.option(
+    "-f",
+    "--fmt",
+    type=click.Choice(Format),
+    default=Format.json,
+    help="Output format.",
+)
+@click.option(
+    "-s",
+    "--source",
+    "sources",
+    type=click.Choice(list(SOURCES)),
+    multiple=True,
+    help="Source to scrape, can be repeated [default: all].",
+)
+@click.option(
+    "-t",
+    "--timeout",
+    type=click.FloatRange(min=0),
+    default=DEFAULT_TIMEOUT,
+    show_default=True,
+    help="Timeout in seconds for connecting to and reading from a source.",
+)
+@click.option(
+    "--source-timeout",
+    "source_timeouts",
+    multiple=True,
+    metavar="NAME=SECONDS",
+    help="Timeout of a single source, can be repeated.",
+)
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False),
+    default=CACHE_DIR,
+    help="Directory for the nlp-progress checkout and parsed files, and for "
+    "the downloaded pages.",
+)
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    default=False,
+    help="Download and parse all the sources.",
+)
+@catch_errors
+def scrape_all_command(
+    output_dir, fmt, sources, timeout, source_timeouts, cache_dir, no_cache
+):
+    """Extract the SOTA tables from all the sources concurrently."""
+    start = time.perf_counter()
+    results = scrape_all(
+        output_dir=output_dir,
+        fmt=fmt,
+        sources=list(sources) or None,
+        timeout=timeout,
+        timeouts=parse_timeouts(source_timeouts),
+        cache_dir=None if no_cache else cache_dir,
+        callback=print_result,
+    )
+    failed = [result.name for result in results if not result.ok]
+    click.echo(
+        f"Scraped {len(results) - len(failed)} of {len(results)} sources in "
+        f"{time.perf_counter() - start:.2f}s."
+    )
+    if failed:
+        sys.exit(1)
@@ -3,17 +3,35 @@ import enum
 
 
 DEBUG = os.environ.get("SOTA_EXTRACTOR_DEBUG", "false").lower() == "true"
+CACHE_DIR = os.environ.get(
+    "SOTA_EXTRACTOR_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "sota-extractor"),
+)
 
 
 class Format(str, enum.Enum):
     """Output format.
 
-    At the moment only supported format is JSON, but in the future YAML support
-    is planned.
+    JSON stores the tasks in a single array, uncompressed or compressed with
+    gzip, zstd or lz4, the last two need the optional zstandard and lz4
+    packages. JSON Lines stores one task per line, with a sidecar index of
+    the line offsets, so single tasks can be read without parsing the whole
+    file. In the compressed variant every line is a separate gzip member. A
+    snapshot is a binary dump of the task objects, the fastest to load, but
+    only for the same version of the models. It is a pickle, so it is never
+    detected and only loaded when asked for. A mapped file stores the tasks
+    in flat arrays, to be opened with `MappedTaskDB` and shared by
+    processes.
     """
 
     json = "json"
     json_gz = "json.gz"
+    json_zst = "json.zst"
+    json_lz4 = "json.lz4"
+    jsonl = "jsonl"
+    jsonl_gz = "jsonl.gz"
+    snapshot = "snapshot"
+    mapped = "mapped"
 
 
 NLP_PROGRESS_REPO = "https://github.com/sebastianruder/NLP-progress"
@@ -49,8 +49,9 @@ class HttpClientError(SotaError):
 
 
 class UnsupportedFormat(SotaError):
-    def __init__(self, fmt):
-        super().__init__(f"Unsupported serialization format: {fmt.value}")
+    def __init__(self, fmt, reason=None):
+        message = f"Unsupported serialization format: {fmt.value}"
+        super().__init__(message if reason is None else f"{message}, {reason}")
         self.fmt = fmt
 
 
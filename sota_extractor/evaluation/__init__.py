@@ -0,0 +1,4 @@
+__all__ = ["CorpusCache", "PhraseIndex"]
+
+from sota_extractor.evaluation.cache import CorpusCache
+from sota_extractor.evaluation.index import PhraseIndex
@@ -0,0 +1,119 @@
+import os
+import io
+import pickle
+import hashlib
+import logging
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+# Bump whenever the format of the cache or the preprocessing of the cached
+# corpus changes, so stale caches are rebuilt.
+CACHE_VERSION = 2
+
+# Marks a field missing from a paper, it can never come out of JSON.
+_MISSING = Ellipsis
+
+
+def file_sha256(filename: str) -> str:
+    """Get the sha256 hex digest of the file contents."""
+    sha = hashlib.sha256()
+    with io.open(filename, mode="rb") as fp:
+        for chunk in iter(lambda: fp.read(1024 * 1024), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+class CorpusCache:
+    """On-disk cache of a preprocessed paper corpus.
+
+    Every source file gets one cache file holding a header, that identifies
+    the source by its size, modification time and sha256 hash, followed by
+    the papers stored column by column. The cache is valid as long as the
+    source has the same size and modification time or, if only the
+    modification time changed, the same contents.
+
+    Args:
+        directory (str): Directory in which the cache files are kept.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def path(self, source: str) -> str:
+        """Get the path of the cache file for the source file."""
+        name = os.path.basename(source)
+        return os.path.join(self.directory, f"{name}.v{CACHE_VERSION}.cache")
+
+    def _header(self, source: str) -> Dict[str, Any]:
+        stat = os.stat(source)
+        return {
+            "version": CACHE_VERSION,
+            "source": os.path.abspath(source),
+            "size": stat.st_size,
+            "mtime": stat.st_mtime_ns,
+            "sha256": file_sha256(source),
+        }
+
+    def _is_valid(self, header: Dict[str, Any], source: str) -> bool:
+        stat = os.stat(source)
+        if (
+            header.get("version") != CACHE_VERSION
+            or header.get("source") != os.path.abspath(source)
+            or header.get("size") != stat.st_size
+        ):
+            return False
+        if header.get("mtime") == stat.st_mtime_ns:
+            return True
+        return header.get("sha256") == file_sha256(source)
+
+    def get(self, source: str) -> Optional[List[Dict]]:
+        """Get the cached papers for the source file.
+
+        Returns:
+            List of papers or None if there is no valid cache for the source.
+        """
+        path = self.path(source)
+        if not os.path.exists(path):
+            return None
+
+        try:
+            with io.open(path, mode="rb") as fp:
+                header = pickle.load(fp)
+                if not self._is_valid(header, source):
+                    logger.info("Stale cache for: %s", source)
+                    return None
+                fields, columns = pickle.load(fp)
+        except (OSError, EOFError, pickle.UnpicklingError) as e:
+            logger.warning("Could not read cache %s: %s", path, e)
+            return None
+
+        return [
+            {
+                field: value
+                for field, value in zip(fields, values)
+                if value is not _MISSING
+            }
+            for values in zip(*columns)
+        ]
+
+    def put(self, source: str, papers: List[Dict]):
+        """Store the papers preprocessed from the source file."""
+        fields: Dict[str, None] = {}
+        for paper in papers:
+            for field in paper:
+                fields[field] = None
+
+        columns = [
+            [paper.get(field, _MISSING) for paper in papers]
+            for field in fields
+        ]
+
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path(source)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with io.open(tmp_path, mode="wb") as fp:
+            pickle.dump(self._header(source), fp, pickle.HIGHEST_PROTOCOL)
+            pickle.dump((list(fields), columns), fp, pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
@@ -0,0 +1,159 @@
+import re
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+TOKEN = re.compile(r"\w+")
+
+# Token matching modes, depending on whether the token touches the start
+# and/or the end of the phrase it belongs to.
+EXACT = "exact"
+PREFIX = "prefix"
+SUFFIX = "suffix"
+INFIX = "infix"
+
+
+def phrase_patterns(phrase: str) -> List[Tuple[str, str]]:
+    """Split a phrase into the token patterns any containing text must have.
+
+    If `phrase` is a substring of a text, every token of the phrase that is
+    delimited by non-word characters inside the phrase is also a token of the
+    text. The first token can only be extended to the left (it is a suffix of
+    a text token), the last one to the right (prefix) and a single token
+    phrase in both directions (infix).
+    """
+    patterns = []
+    for match in TOKEN.finditer(phrase):
+        left_open = match.start() == 0
+        right_open = match.end() == len(phrase)
+        if left_open and right_open:
+            mode = INFIX
+        elif left_open:
+            mode = SUFFIX
+        elif right_open:
+            mode = PREFIX
+        else:
+            mode = EXACT
+        patterns.append((match.group(), mode))
+    return patterns
+
+
+class PhraseIndex:
+    """Inverted index from phrases to the documents that might contain them.
+
+    The index is keyed on a fixed set of phrases known upfront (e.g. task
+    names and synonyms), so it only keeps the postings needed to answer them.
+    Candidates returned by the index are a superset of the documents that
+    contain the phrase as a substring, they still need to be verified, but
+    no document containing the phrase is ever missed.
+
+    Args:
+        phrases: Phrases that will be looked up in the index. They are
+            matched against the documents as is, so they should already be
+            normalized the same way the documents are (e.g. lowercased).
+    """
+
+    def __init__(self, phrases: Iterable[str]):
+        self.n_docs = 0
+        self.phrases: Dict[str, List[int]] = {}
+        self.postings: List[List[int]] = []
+
+        self._patterns: Dict[Tuple[str, str], int] = {}
+        self._exact: Dict[str, List[int]] = {}
+        self._prefix: Dict[int, Dict[str, List[int]]] = {}
+        self._suffix: Dict[int, Dict[str, List[int]]] = {}
+        self._infix: List[Tuple[str, int]] = []
+        self._token_cache: Dict[str, List[int]] = {}
+        # tokens not matching any pattern, the vast majority of them
+        self._misses: Set[str] = set()
+
+        for phrase in phrases:
+            self._add_phrase(phrase)
+
+    def _add_phrase(self, phrase: str):
+        if phrase in self.phrases:
+            return
+        pattern_ids = []
+        for pattern in phrase_patterns(phrase):
+            pattern_id = self._patterns.get(pattern)
+            if pattern_id is None:
+                pattern_id = len(self.postings)
+                self._patterns[pattern] = pattern_id
+                self.postings.append([])
+                token, mode = pattern
+                if mode == EXACT:
+                    self._exact.setdefault(token, []).append(pattern_id)
+                elif mode == PREFIX:
+                    self._prefix.setdefault(len(token), {}).setdefault(
+                        token, []
+                    ).append(pattern_id)
+                elif mode == SUFFIX:
+                    self._suffix.setdefault(len(token), {}).setdefault(
+                        token, []
+                    ).append(pattern_id)
+                else:
+                    self._infix.append((token, pattern_id))
+            pattern_ids.append(pattern_id)
+        self.phrases[phrase] = pattern_ids
+
+    def _token_patterns(self, token: str) -> List[int]:
+        """Get the ids of all the patterns matched by a document token."""
+        pattern_ids = self._token_cache.get(token)
+        if pattern_ids is None:
+            pattern_ids = list(self._exact.get(token, ()))
+            for length, patterns in self._prefix.items():
+                pattern_ids.extend(patterns.get(token[:length], ()))
+            for length, patterns in self._suffix.items():
+                if length <= len(token):
+                    pattern_ids.extend(patterns.get(token[-length:], ()))
+            for pattern, pattern_id in self._infix:
+                if pattern in token:
+                    pattern_ids.append(pattern_id)
+            if pattern_ids:
+                self._token_cache[token] = pattern_ids
+            else:
+                self._misses.add(token)
+        return pattern_ids
+
+    def add(self, *texts: str) -> int:
+        """Index a document consisting of one or more texts.
+
+        Returns:
+            int: Document id, documents are numbered in the order they are
+                added starting from 0.
+        """
+        doc_id = self.n_docs
+        self.n_docs += 1
+
+        tokens = set()
+        for text in texts:
+            tokens.update(TOKEN.findall(text))
+        tokens.difference_update(self._misses)
+
+        pattern_ids = set()
+        for token in tokens:
+            pattern_ids.update(self._token_patterns(token))
+        for pattern_id in pattern_ids:
+            self.postings[pattern_id].append(doc_id)
+        return doc_id
+
+    def candidates(self, phrase: str) -> Optional[Set[int]]:
+        """Get ids of the documents that might contain the phrase.
+
+        Returns:
+            Set of document ids or None if the phrase has no word tokens and
+            therefore every document is a candidate.
+        """
+        if phrase not in self.phrases:
+            raise KeyError(f"Phrase not indexed: {phrase}")
+
+        pattern_ids = sorted(
+            self.phrases[phrase], key=lambda i: len(self.postings[i])
+        )
+        if not pattern_ids:
+            return None
+        docs = set(self.postings[pattern_ids[0]])
+        for pattern_id in pattern_ids[1:]:
+            if not docs:
+                break
+            docs.intersection_update(self.postings[pattern_id])
+        return docs
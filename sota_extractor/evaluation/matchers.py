@@ -0,0 +1,163 @@
+from typing import Dict, List, Optional, Tuple, Type
+
+from sota_extractor.errors import ArgumentError
+from sota_extractor.taskdb.v01 import Task
+from sota_extractor.evaluation.index import PhraseIndex
+
+
+SOTA_PHRASES = (
+    "state-of-the-art",
+    "state-of-art",
+    "state of the art",
+    "state of art",
+    "sota",
+)
+
+
+def contains_sota(abstract_lower: str) -> bool:
+    """Check if a lowercased abstract mentions state-of-the-art."""
+    return any(phrase in abstract_lower for phrase in SOTA_PHRASES)
+
+
+def task_names(task: Task) -> List[str]:
+    """Get the lowercased task name and synonyms."""
+    return [name.lower() for name in [task.name] + task.synonyms]
+
+
+def article_matches(paper: Dict, task: Task):
+    """Check if a paper mentions the tasks.
+
+    By mentioning it in the title or abstract.
+    And also mentioning state-of-the-art.
+    """
+
+    title = paper["title_lower"]
+    abstract = paper["abstract_lower"]
+
+    matches_paper = False
+    for task_name_lower in task_names(task):
+        matches_paper = matches_paper or task_name_lower in title
+        matches_paper = matches_paper or task_name_lower in abstract
+
+    mentions_sota = paper.get("contains_sota")
+    if mentions_sota is None:
+        mentions_sota = contains_sota(abstract)
+
+    return matches_paper and mentions_sota
+
+
+def build_index(papers: List[Dict], tasks: List[Task]) -> PhraseIndex:
+    """Index paper titles and abstracts by the task names and synonyms."""
+    index = PhraseIndex(name for task in tasks for name in task_names(task))
+    for paper in papers:
+        index.add(paper["title_lower"], paper["abstract_lower"])
+    return index
+
+
+def predict(papers: List[Dict], index: PhraseIndex, task: Task) -> List[Dict]:
+    """Get the papers matching the task.
+
+    Gives the same predictions as checking `article_matches` for every paper,
+    but only the candidates from the index are checked.
+    """
+    candidates = set()
+    for name in task_names(task):
+        docs = index.candidates(name)
+        if docs is None:
+            candidates = range(len(papers))
+            break
+        candidates.update(docs)
+
+    return [
+        papers[i]
+        for i in sorted(candidates)
+        if article_matches(papers[i], task)
+    ]
+
+
+class Matcher:
+    """Predicts which papers of a corpus are about a task.
+
+    Matchers declare the derived paper fields (see `evaluate.FEATURES`) they
+    read, so only those are computed when the corpus is loaded.
+    """
+
+    #: Name under which the matcher is registered.
+    name: str = ""
+    #: Derived paper fields used by the matcher.
+    features: Tuple[str, ...] = ()
+
+    def prepare(self, papers: List[Dict], tasks: List[Task]):
+        """Preprocess the corpus before the tasks are matched.
+
+        Optional, matchers that need it must prepare themselves lazily in
+        `match` if it was not called.
+        """
+
+    def match(self, papers: List[Dict], task: Task) -> List[Dict]:
+        """Get the papers predicted to be about the task.
+
+        Args:
+            papers: Paper corpus.
+            task: The task we are doing predictions against.
+
+        Returns:
+            Predicted papers in corpus order.
+        """
+        raise NotImplementedError
+
+
+class SubstringMatcher(Matcher):
+    """Checks every paper with `article_matches`."""
+
+    name = "substring"
+    features = ("title_lower", "abstract_lower", "contains_sota")
+
+    def match(self, papers: List[Dict], task: Task) -> List[Dict]:
+        return [paper for paper in papers if article_matches(paper, task)]
+
+
+class IndexedMatcher(Matcher):
+    """Gives the same predictions as the substring matcher.
+
+    Papers mentioning state-of-the-art are indexed by the task names and
+    synonyms, and only the candidates from the index are checked with
+    `article_matches`.
+    """
+
+    name = "indexed"
+    features = ("title_lower", "abstract_lower", "contains_sota")
+
+    def __init__(self):
+        self.papers: Optional[List[Dict]] = None
+        self.sota_papers: List[Dict] = []
+        self.index: Optional[PhraseIndex] = None
+
+    def prepare(self, papers: List[Dict], tasks: List[Task]):
+        self.papers = papers
+        # only papers mentioning state-of-the-art can match any of the tasks
+        self.sota_papers = [a for a in papers if a["contains_sota"]]
+        self.index = build_index(self.sota_papers, tasks)
+
+    def match(self, papers: List[Dict], task: Task) -> List[Dict]:
+        if self.papers is not papers or any(
+            name not in self.index.phrases for name in task_names(task)
+        ):
+            self.prepare(papers, [task])
+        return predict(self.sota_papers, self.index, task)
+
+
+MATCHERS: Dict[str, Type[Matcher]] = {
+    matcher.name: matcher for matcher in [SubstringMatcher, IndexedMatcher]
+}
+
+DEFAULT_MATCHER = IndexedMatcher.name
+
+
+def get_matcher(name: str) -> Matcher:
+    """Create a matcher by its registered name."""
+    if name not in MATCHERS:
+        raise ArgumentError(
+            f"Unknown matcher: {name}, choose from: {', '.join(MATCHERS)}"
+        )
+    return MATCHERS[name]()
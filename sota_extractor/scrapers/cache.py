@@ -0,0 +1,128 @@
+import os
+import io
+import json
+import hashlib
+import logging
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+import requests
+
+from sota_extractor.errors import DataError
+from sota_extractor.taskdb.v01 import TaskDB
+
+logger = logging.getLogger(__name__)
+
+
+# Bump whenever the format of the cache or the parsing of a scraper changes,
+# so the stale task databases are not reused.
+CACHE_VERSION = 1
+
+
+class HttpCache:
+    """On-disk cache of the pages downloaded by the scrapers.
+
+    Every URL gets one cache file holding its validators (ETag and
+    Last-Modified), the response body and the TaskDB the scraper parsed out of
+    it. The file is written in one go, after the page was parsed, so the
+    validators always belong to the cached TaskDB. The next request for the
+    URL is conditional and if the server answers 304 Not Modified the cached
+    TaskDB is reused without parsing the page again.
+
+    Args:
+        directory (str): Directory in which the cache files are kept.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def path(self, url: str) -> str:
+        """Get the path of the cache file for the URL."""
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{key}.v{CACHE_VERSION}.json")
+
+    def _read(self, url: str) -> Optional[Dict[str, Any]]:
+        path = self.path(url)
+        if not os.path.isfile(path):
+            return None
+        try:
+            with io.open(path, "r", encoding="utf-8") as fp:
+                entry = json.load(fp)
+        except (OSError, ValueError) as e:
+            logger.warning("Could not read cache file %s: %s", path, e)
+            return None
+        if entry.get("url") != url:
+            return None
+        return entry
+
+    def get(
+        self,
+        url: str,
+        session: Optional[requests.Session] = None,
+        timeout: Optional[float] = None,
+    ) -> Tuple[requests.Response, Optional[TaskDB]]:
+        """Send a conditional GET request for the URL.
+
+        Args:
+            url: URL to get.
+            session: HTTP session shared between the scrapers.
+            timeout: Timeout in seconds, None to wait forever.
+
+        Returns:
+            The response and, if the page was not modified since it was
+            cached, the cached TaskDB.
+        """
+        entry = self._read(url)
+        headers = {}
+        if entry is not None:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        response = (session or requests).get(
+            url, headers=headers, timeout=timeout
+        )
+        if response.status_code != 304 or not headers:
+            return response, None
+
+        logger.info("Not modified: %s", url)
+        tdb = TaskDB()
+        try:
+            tdb.load_tasks(data=entry["tasks"])
+        except (KeyError, DataError) as e:
+            logger.warning("Invalid cache entry for %s: %s", url, e)
+            # the cached page is unusable, download it again
+            os.remove(self.path(url))
+            return self.get(url, session=session, timeout=timeout)
+        return response, tdb
+
+    def store(self, url: str, response: requests.Response, tdb: TaskDB):
+        """Store the page and the TaskDB parsed from it.
+
+        Responses without an ETag or Last-Modified header can not be
+        validated, so they are not stored.
+
+        Args:
+            url: URL of the page.
+            response: Response the TaskDB was parsed from.
+            tdb: Parsed TaskDB.
+        """
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if response.status_code != 200 or not (etag or last_modified):
+            return
+
+        entry = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "body": response.text,
+            "tasks": tdb.export(),
+        }
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path(url)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with io.open(tmp_path, "w", encoding="utf-8") as fp:
+            json.dump(entry, fp)
+        os.replace(tmp_path, path)
@@ -1,5 +1,6 @@
+import requests
 from sota_extractor.errors import DataError
-from sota_extractor.scrapers.utils import get_soup
+from sota_extractor.scrapers.utils import make_soup, scraper
 from sota_extractor.taskdb.v01 import SotaRow, Dataset, Task, Link, TaskDB
 
 CITYSCAPES_URL = (
@@ -53,9 +54,10 @@ def get_sota_rows(table):
     return sota_rows
 
 
-def cityscapes() -> TaskDB:
+@scraper(CITYSCAPES_URL)
+def cityscapes(response: requests.Response) -> TaskDB:
     """Extract Cityscapes SOTA tables."""
-    soup = get_soup(CITYSCAPES_URL)
+    soup = make_soup(response)
 
     sota_tabels = soup.findAll("table", attrs={"class": "tablepress"})
 
@@ -1,6 +1,7 @@
 import json
 import requests
 from sota_extractor.errors import HttpClientError
+from sota_extractor.scrapers.utils import scraper
 from sota_extractor.consts import EFF_TASK_CONVERSION
 from sota_extractor.taskdb.v01 import (
     Task,
@@ -17,10 +18,9 @@ EFF_URL = (
 )
 
 
-def eff() -> TaskDB:
+@scraper(EFF_URL)
+def eff(response: requests.Response) -> TaskDB:
     """Extract EFF SOTA tables."""
-
-    response = requests.get(EFF_URL)
     if response.status_code != 200:
         raise HttpClientError("Resource unavailable", response=response)
     j = json.loads(response.text)
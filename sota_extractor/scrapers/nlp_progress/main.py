@@ -1,43 +1,171 @@
 import os
-import glob
 import logging
 import tempfile
 import subprocess
+import multiprocessing
+from typing import Dict, List, Optional, Tuple
 
+from sota_extractor import serialization
 from sota_extractor.errors import DataError
-from sota_extractor.taskdb.v01 import TaskDB
+from sota_extractor.taskdb.v01 import Task, TaskDB
 from sota_extractor.consts import NLP_PROGRESS_REPO
 from sota_extractor.scrapers.nlp_progress.markdown import parse_file
 
 logger = logging.getLogger(__name__)
 
+#: Version of the parsed file fragments, bump it when the parser changes.
+FRAGMENTS_VERSION = 1
 
-def nlp_progress() -> TaskDB:
-    """Parse a the whole nlp progress repo or a single markdown file.
+
+def git(*args: str, timeout: Optional[float] = None) -> str:
+    """Run a git command and get its output.
+
+    Args:
+        args: Git arguments.
+        timeout: Timeout in seconds, None to wait forever.
+    """
+    try:
+        cp = subprocess.run(
+            ["git", *args], capture_output=True, timeout=timeout
+        )
+    except subprocess.TimeoutExpired:
+        raise DataError(f"Git command timed out: git {' '.join(args)}")
+    if cp.returncode != 0:
+        logger.error("stdout: %s", cp.stdout)
+        logger.error("stderr: %s", cp.stderr)
+        raise DataError(f"Git command failed: git {' '.join(args)}")
+    return cp.stdout.decode("utf-8")
+
+
+def checkout(repo: str, path: str, timeout: Optional[float] = None):
+    """Clone the repository into path or update the existing checkout.
+
+    Args:
+        repo: Repository url or path to a local (bare) repository.
+        path: Path of the checkout.
+        timeout: Timeout in seconds for the clone or fetch.
+    """
+    if not os.path.isdir(os.path.join(path, ".git")):
+        git("clone", "--quiet", repo, path, timeout=timeout)
+    else:
+        git("-C", path, "fetch", "--quiet", repo, "HEAD", timeout=timeout)
+        git("-C", path, "reset", "--quiet", "--hard", "FETCH_HEAD")
+
+
+def list_files(path: str) -> List[Tuple[str, str]]:
+    """Get the markdown files in the checkout and their blob hashes.
+
+    Returns:
+        List of (filename, blob hash) pairs, sorted by filename.
+    """
+    files = []
+    output = git("-C", path, "ls-tree", "-z", "HEAD", "english/")
+    for entry in output.split("\0"):
+        if not entry:
+            continue
+        info, filename = entry.split("\t", 1)
+        _, kind, blob = info.split()
+        if kind == "blob" and filename.endswith(".md"):
+            files.append((filename, blob))
+    return sorted(files)
+
+
+def load_fragment(path: str) -> Optional[List[Task]]:
+    """Load the tasks of a parsed file, None if it was not parsed before."""
+    if not os.path.isfile(path):
+        return None
+    try:
+        tdb = TaskDB()
+        tdb.load_tasks(path)
+        return list(tdb.tasks.values())
+    except (OSError, ValueError, DataError) as e:
+        logger.warning("Could not read fragment %s: %s", path, e)
+        return None
+
+
+def parse_fragment(paths: Tuple[str, str]) -> List[Task]:
+    """Parse a markdown file and store the parsed tasks as a fragment.
+
+    Args:
+        paths: Path of the markdown file and of the fragment.
+    """
+    filename, path = paths
+    logger.info("Parsing: %s", filename)
+    tdb = parse_file(filename)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    serialization.dump(tdb, tmp_path)
+    os.replace(tmp_path, path)
+    return list(tdb.tasks.values())
+
+
+def nlp_progress(
+    repo: str = NLP_PROGRESS_REPO,
+    cache_dir: Optional[str] = None,
+    jobs: int = 1,
+    timeout: Optional[float] = None,
+) -> TaskDB:
+    """Parse the whole nlp progress repo.
 
     Checkouts the nlp progress git repository and parses all the markdown files
     in it.
 
+    With a cache directory the checkout is kept there and only fetched on the
+    next run, and the parsed files are cached by their blob hash, so only the
+    changed files are parsed again.
+
+    Args:
+        repo: Repository url or path to a local (bare) repository.
+        cache_dir: Directory for the checkout and the parsed files, if None a
+            temporary directory is used.
+        jobs: Number of worker processes parsing the files. The tasks are
+            merged in the filename order, so the result does not depend on
+            it.
+        timeout: Timeout in seconds for cloning or fetching the repository,
+            None to wait forever.
+
     Returns:
         TaskDB: Populated task database.
     """
-    tdb = TaskDB()
+    if cache_dir is None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            return nlp_progress(
+                repo=repo, cache_dir=tmpdir, jobs=jobs, timeout=timeout
+            )
 
-    with tempfile.TemporaryDirectory() as tmpdir:
-        repo_path = os.path.join(tmpdir, "nlp-progress")
-        cp = subprocess.run(
-            ["git", "clone", NLP_PROGRESS_REPO, repo_path], capture_output=True
-        )
-        if cp.returncode != 0:
-            logger.error("stdout: %s", cp.stdout)
-            logger.error("stderr: %s", cp.stderr)
-            raise DataError("Could not clone the NLP Progress repository.")
+    checkout_path = os.path.join(cache_dir, "nlp-progress")
+    directory = os.path.join(
+        cache_dir, f"nlp-progress-fragments-v{FRAGMENTS_VERSION}"
+    )
+    os.makedirs(directory, exist_ok=True)
+    checkout(repo, checkout_path, timeout=timeout)
+
+    files = list_files(checkout_path)
+    fragments: Dict[str, List[Task]] = {}
+    changed, paths = [], []
+    for filename, blob in files:
+        path = os.path.join(directory, f"{blob}.json")
+        tasks = load_fragment(path)
+        if tasks is None:
+            changed.append(filename)
+            paths.append((os.path.join(checkout_path, filename), path))
+        else:
+            fragments[filename] = tasks
 
-        filenames = glob.glob(os.path.join(repo_path, "english", "*.md"))
+    if jobs > 1 and len(paths) > 1:
+        with multiprocessing.Pool(min(jobs, len(paths))) as pool:
+            parsed = pool.map(parse_fragment, paths)
+    else:
+        parsed = [parse_fragment(p) for p in paths]
+    fragments.update(zip(changed, parsed))
 
-        for filename in filenames:
-            file_tdb = parse_file(filename)
-            for task in file_tdb.tasks.values():
-                tdb.add_task(task)
+    tdb = TaskDB()
+    for filename, _ in files:
+        for task in fragments[filename]:
+            tdb.add_task(task)
 
+    # remove the fragments of the files that were changed or removed
+    blobs = {blob for _, blob in files}
+    for name in os.listdir(directory):
+        if name.split(".", 1)[0] not in blobs:
+            os.remove(os.path.join(directory, name))
     return tdb
@@ -1,5 +1,6 @@
 import io
 import logging
+import threading
 from typing import List
 
 import markdown
@@ -153,22 +154,73 @@ class ParserProcessor(Treeprocessor):
 
 
 class Markdown(markdown.Markdown):
+    """Markdown parser collecting the tasks instead of rendering HTML.
+
+    An instance can be reused for any number of documents, `parse` resets it
+    before every document.
+    """
+
     def __init__(self):
-        super().__init__(extensions=[TableExtension()])
+        # created first, the base class resets the parser when initialized
         self.parser_processor = ParserProcessor(self)
+        super().__init__(extensions=[TableExtension()])
         self.treeprocessors.register(
             self.parser_processor, "parser_processor", 1
         )
 
+    def reset(self):
+        super().reset()
+        self.parser_processor.parsed = []
+        return self
+
+    def parse(self, source: str) -> List[Task]:
+        """Parse the tasks from markdown text.
+
+        Runs the same steps as `convert` up to the tree processors, the tree
+        is not serialized.
+        """
+        self.reset()
+        if not source.strip():
+            return []
+
+        self.lines = source.split("\n")
+        for prep in self.preprocessors:
+            self.lines = prep.run(self.lines)
+
+        root = self.parser.parseDocument(self.lines).getroot()
+        for treeprocessor in self.treeprocessors:
+            new_root = treeprocessor.run(root)
+            if new_root is not None:
+                root = new_root
+        return self.parser_processor.parsed
 
-def parse_file(filename: str) -> TaskDB:
-    """Parse an NLP-Progress markdown file and return a TaskDB instance."""
-    md = Markdown()
-    with io.open("/dev/null", "wb") as f:
-        md.convertFile(filename, output=f)
+
+# One parser per thread, markdown instances are not thread safe.
+_local = threading.local()
+
+
+def get_markdown() -> Markdown:
+    """Get the parser of the current thread."""
+    md = getattr(_local, "markdown", None)
+    if md is None:
+        md = _local.markdown = Markdown()
+    return md
+
+
+def parse_text(text: str) -> TaskDB:
+    """Parse NLP-Progress markdown text and return a TaskDB instance."""
+    # remove the byte-order mark, as Markdown.convertFile does
+    tasks = get_markdown().parse(text.lstrip("\ufeff"))
 
     tdb = TaskDB()
-    for task in md.parser_processor.parsed:
+    for task in tasks:
         for t in fix_task(task):
             tdb.add_task(t)
     return tdb
+
+
+def parse_file(filename: str) -> TaskDB:
+    """Parse an NLP-Progress markdown file and return a TaskDB instance."""
+    # read as bytes to keep the line endings, as Markdown.convertFile does
+    with io.open(filename, "rb") as f:
+        return parse_text(f.read().decode("utf-8"))
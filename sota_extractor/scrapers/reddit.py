@@ -1,6 +1,8 @@
 import re
 import requests
 from bs4 import BeautifulSoup
+from sota_extractor.errors import HttpClientError
+from sota_extractor.scrapers.utils import scraper
 from sota_extractor.taskdb.v01 import (
     Task,
     Dataset,
@@ -16,10 +18,13 @@ REDITSOTA_URL = (
 )
 
 
-def reddit() -> TaskDB:
+@scraper(REDITSOTA_URL)
+def reddit(response: requests.Response) -> TaskDB:
     """Extract Reddit SOTA tables."""
+    if response.status_code != 200:
+        raise HttpClientError("Resource unavailable", response=response)
+    md = response.text
     tdb = TaskDB()
-    md = requests.get(REDITSOTA_URL).text
 
     # assumptions:
     # ### Category
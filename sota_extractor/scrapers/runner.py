@@ -0,0 +1,169 @@
+import os
+import time
+import logging
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional
+
+import requests
+
+from sota_extractor import serialization
+from sota_extractor.consts import Format
+from sota_extractor.errors import ArgumentError, SotaError
+from sota_extractor.taskdb.v01 import TaskDB
+from sota_extractor.scrapers.eff import eff
+from sota_extractor.scrapers.snli import snli
+from sota_extractor.scrapers.squad import squad
+from sota_extractor.scrapers.reddit import reddit
+from sota_extractor.scrapers.cityscapes import cityscapes
+from sota_extractor.scrapers.cache import HttpCache
+from sota_extractor.scrapers.nlp_progress import nlp_progress
+from sota_extractor.scrapers.utils import DEFAULT_TIMEOUT, create_session
+
+logger = logging.getLogger(__name__)
+
+
+#: Scraped sources and the names of their output files, without extension.
+SOURCES = {
+    "eff": "eff",
+    "reddit": "redditsota",
+    "snli": "snli",
+    "squad": "squad",
+    "cityscapes": "cityscapes",
+    "nlp-progress": "nlp-progress",
+}
+
+
+@dataclass
+class SourceResult:
+    """Outcome of scraping a source."""
+
+    name: str
+    #: Output file, written only if the source was scraped successfully.
+    output: str
+    #: Time to scrape the source and write the output file.
+    seconds: float
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def scrape(
+    name: str,
+    session: Optional[requests.Session] = None,
+    timeout: Optional[float] = DEFAULT_TIMEOUT,
+    cache_dir: Optional[str] = None,
+) -> TaskDB:
+    """Scrape a source by name.
+
+    Args:
+        name: Source name, see `SOURCES`.
+        session: HTTP session shared between the scrapers.
+        timeout: Timeout in seconds, for the HTTP requests or for cloning and
+            fetching the nlp-progress repository.
+        cache_dir: Cache directory of the nlp-progress scraper and of the
+            pages downloaded by the other scrapers, None to not cache them.
+    """
+    if name == "nlp-progress":
+        return nlp_progress(cache_dir=cache_dir, timeout=timeout)
+    scrapers = {
+        "eff": eff,
+        "reddit": reddit,
+        "snli": snli,
+        "squad": squad,
+        "cityscapes": cityscapes,
+    }
+    cache = None
+    if cache_dir is not None:
+        cache = HttpCache(os.path.join(cache_dir, "http"))
+    return scrapers[name](session=session, timeout=timeout, cache=cache)
+
+
+def _scrape_to_file(
+    name: str,
+    output: str,
+    fmt: Format,
+    session: requests.Session,
+    timeout: Optional[float],
+    cache_dir: Optional[str],
+) -> SourceResult:
+    start = time.perf_counter()
+    try:
+        tdb = scrape(
+            name, session=session, timeout=timeout, cache_dir=cache_dir
+        )
+        serialization.dump(tdb, output=output, fmt=fmt)
+        error = None
+    except Exception as e:
+        logger.debug("Scraping %s failed.", name, exc_info=True)
+        error = str(e) if isinstance(e, SotaError) else f"{e!r}"
+    return SourceResult(
+        name=name,
+        output=output,
+        seconds=time.perf_counter() - start,
+        error=error,
+    )
+
+
+def scrape_all(
+    output_dir: str = "data/tasks",
+    fmt: Format = Format.json,
+    sources: Optional[List[str]] = None,
+    timeout: Optional[float] = DEFAULT_TIMEOUT,
+    timeouts: Optional[Dict[str, float]] = None,
+    cache_dir: Optional[str] = None,
+    callback: Optional[Callable[[SourceResult], None]] = None,
+) -> List[SourceResult]:
+    """Scrape the sources concurrently.
+
+    Every source is scraped in its own thread, the HTTP sources share a
+    session, and its output file is written as soon as it is scraped. A
+    failing source does not stop the others.
+
+    Args:
+        output_dir: Directory of the output files.
+        fmt: Serialization format.
+        sources: Names of the sources to scrape, all of them by default.
+        timeout: Timeout in seconds for the sources without their own.
+        timeouts: Timeouts in seconds by source name.
+        cache_dir: Cache directory of the nlp-progress scraper and of the
+            pages downloaded by the other scrapers, None to not cache them.
+        callback: Called with the result of every source as it completes.
+
+    Returns:
+        Results in the order in which the sources completed.
+    """
+    sources = list(SOURCES) if sources is None else sources
+    timeouts = timeouts or {}
+    unknown = [name for name in [*sources, *timeouts] if name not in SOURCES]
+    if unknown:
+        raise ArgumentError(
+            f"Unknown sources: {', '.join(unknown)}, choose from: "
+            f"{', '.join(SOURCES)}"
+        )
+
+    os.makedirs(output_dir, exist_ok=True)
+    results = []
+    workers = max(len(sources), 1)
+    with create_session(pool_size=workers) as session:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(
+                    _scrape_to_file,
+                    name,
+                    os.path.join(output_dir, f"{SOURCES[name]}.{fmt.value}"),
+                    fmt,
+                    session,
+                    timeouts.get(name, timeout),
+                    cache_dir,
+                )
+                for name in sources
+            ]
+            for future in as_completed(futures):
+                result = future.result()
+                if callback is not None:
+                    callback(result)
+                results.append(result)
+    return results
@@ -1,4 +1,5 @@
-from sota_extractor.scrapers.utils import get_soup
+import requests
+from sota_extractor.scrapers.utils import make_soup, scraper
 from sota_extractor.taskdb.v01 import (
     Link,
     Task,
@@ -11,9 +12,10 @@ from sota_extractor.taskdb.v01 import (
 SNLI_URL = "https://nlp.stanford.edu/projects/snli/"
 
 
-def snli() -> TaskDB:
+@scraper(SNLI_URL)
+def snli(response: requests.Response) -> TaskDB:
     """Extract SNLI SOTA tables."""
-    soup = get_soup(SNLI_URL)
+    soup = make_soup(response)
 
     table = soup.findAll("table", attrs={"class": "newstuff"})[1]
 
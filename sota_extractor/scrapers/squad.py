@@ -1,6 +1,7 @@
+import requests
 from datetime import datetime
 from sota_extractor.errors import DataError
-from sota_extractor.scrapers.utils import get_soup
+from sota_extractor.scrapers.utils import make_soup, scraper
 from sota_extractor.taskdb.v01 import SotaRow, Dataset, Task, Link, TaskDB
 
 SQUAD_URL = "https://rajpurkar.github.io/SQuAD-explorer/"
@@ -64,9 +65,10 @@ def get_sota_rows(table):
     return sota_rows
 
 
-def squad() -> TaskDB:
+@scraper(SQUAD_URL)
+def squad(response: requests.Response) -> TaskDB:
     """Extract SQUAD SOTA tables."""
-    soup = get_soup(SQUAD_URL)
+    soup = make_soup(response)
 
     sota_tabels = soup.findAll("table", attrs={"class": "performanceTable"})
 
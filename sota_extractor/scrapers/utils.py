@@ -1,18 +1,108 @@
+import functools
+from typing import Callable, Optional, Tuple
+
 import requests
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
 
+from sota_extractor.taskdb.v01 import TaskDB
+from sota_extractor.scrapers.cache import HttpCache
+
+
+#: Default timeout, in seconds, for connecting to and reading from a source.
+DEFAULT_TIMEOUT = 60.0
+
+
+def create_session(pool_size: int = 10) -> requests.Session:
+    """Create an HTTP session keeping the connections to the sources alive.
+
+    Args:
+        pool_size: Number of connections kept per host, should be at least
+            the number of concurrent requests.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get(
+    url: str,
+    session: Optional[requests.Session] = None,
+    timeout: Optional[float] = DEFAULT_TIMEOUT,
+) -> requests.Response:
+    """Send a GET request, through the session if there is one.
+
+    Args:
+        url: URL to get.
+        session: HTTP session shared between the scrapers.
+        timeout: Timeout in seconds, None to wait forever.
+    """
+    return (session or requests).get(url, timeout=timeout)
+
 
-def get_soup(url):
-    """Get a BeautifulSoup object back from the a URL.
+def fetch(
+    url: str,
+    session: Optional[requests.Session] = None,
+    timeout: Optional[float] = DEFAULT_TIMEOUT,
+    cache: Optional[HttpCache] = None,
+) -> Tuple[requests.Response, Optional[TaskDB]]:
+    """Send a GET request, conditional if the page is in the cache.
 
     Args:
-        url: URL to scrape.
+        url: URL to get.
+        session: HTTP session shared between the scrapers.
+        timeout: Timeout in seconds, None to wait forever.
+        cache: HTTP cache, None to always download the page.
+
+    Returns:
+        The response and, if the page was not modified since it was cached,
+        the TaskDB previously parsed from it.
     """
+    if cache is None:
+        return get(url, session=session, timeout=timeout), None
+    return cache.get(url, session=session, timeout=timeout)
 
-    r = requests.get(url)
 
-    if r.status_code == 404:
+def make_soup(response: requests.Response):
+    """Get a BeautifulSoup object back from a response, None if not found."""
+    if response.status_code == 404:
         return None
+    return BeautifulSoup(response.text, "lxml")
+
+
+def scraper(url: str):
+    """Make a scraper of the URL out of a function parsing the page.
+
+    The scraper downloads the page, see `fetch`, and passes the response to
+    the decorated function. With a cache the request is conditional and the
+    parsed TaskDB is stored, so it is reused as long as the page is not
+    modified. The URL is kept in the `url` attribute of the scraper.
+
+    The scraper takes the HTTP session shared between the scrapers, the
+    timeout in seconds, None to wait forever, and the HTTP cache, None to
+    always download and parse the page.
+    """
+
+    def decorator(parse: Callable[[requests.Response], TaskDB]):
+        @functools.wraps(parse)
+        def wrapper(
+            session: Optional[requests.Session] = None,
+            timeout: Optional[float] = DEFAULT_TIMEOUT,
+            cache: Optional[HttpCache] = None,
+        ) -> TaskDB:
+            response, previous = fetch(
+                wrapper.url, session=session, timeout=timeout, cache=cache
+            )
+            if previous is not None:
+                return previous
+            tdb = parse(response)
+            if cache is not None:
+                cache.store(wrapper.url, response, tdb)
+            return tdb
+
+        wrapper.url = url
+        return wrapper
 
-    data = r.text
-    return BeautifulSoup(data, "lxml")
+    return decorator
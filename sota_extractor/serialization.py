@@ -1,9 +1,105 @@
 import io
+import os
+import re
 import json
 import gzip
+import pickle
+import struct
+import importlib
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from sota_extractor import errors
 from sota_extractor.consts import Format
-from sota_extractor.taskdb import TaskDB
+from sota_extractor.taskdb import LazyTaskDB, Task, TaskDB
+from sota_extractor.taskdb.v01.mapped import (
+    MAPPED_MAGIC,
+    MappedTaskDB,
+    dump_mapped,
+)
+
+
+# Size of the text chunks read by the streaming loader.
+CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+# Version of the JSON Lines index, bump it when its layout changes.
+INDEX_VERSION = 1
+
+_LINE_FORMATS = (Format.jsonl, Format.jsonl_gz)
+
+# Header of the snapshots, followed by the snapshot version.
+SNAPSHOT_MAGIC = b"SOTATDB"
+_SNAPSHOT_VERSION = struct.Struct("<H")
+
+# Version of the snapshots, bump it whenever the models change, so snapshots
+# written with other models are rejected instead of loaded wrong.
+SNAPSHOT_VERSION = 1
+
+# Compressed JSON formats and the modules and extras providing them, the
+# optional ones are imported only when used.
+_COMPRESSED = {
+    Format.json_gz: ("gzip", None),
+    Format.json_zst: ("zstandard", "zstd"),
+    Format.json_lz4: ("lz4.frame", "lz4"),
+}
+
+# Magic bytes at the start of the files. Gzip is used by both json.gz and
+# jsonl.gz, the extension tells them apart. Snapshots are pickles and are
+# never detected, they are loaded only when asked for with Format.snapshot.
+_MAGIC = [
+    (b"\x1f\x8b", Format.json_gz),
+    (b"\x28\xb5\x2f\xfd", Format.json_zst),
+    (b"\x04\x22\x4d\x18", Format.json_lz4),
+    (MAPPED_MAGIC, Format.mapped),
+]
+
+
+def format_from_extension(filename: str) -> Optional[Format]:
+    """Get the format by the extension of the file, None if unknown."""
+    matches = [fmt for fmt in Format if filename.endswith(f".{fmt.value}")]
+    return max(matches, key=lambda fmt: len(fmt.value), default=None)
+
+
+def detect_format(filename: str) -> Format:
+    """Detect the format of a file.
+
+    Binary and compressed files are detected by their magic bytes, text files
+    by the extension, JSON Lines if it is ``.jsonl`` and JSON otherwise.
+
+    Raises:
+        DataError: If the file is a snapshot, snapshots are pickles and have
+            to be loaded explicitly with `Format.snapshot`.
+    """
+    extension = format_from_extension(filename)
+    with io.open(filename, mode="rb") as fp:
+        head = fp.read(
+            max(len(SNAPSHOT_MAGIC), *(len(magic) for magic, _ in _MAGIC))
+        )
+    if head.startswith(SNAPSHOT_MAGIC):
+        raise errors.DataError(
+            f"{filename} is a snapshot, load it with fmt=Format.snapshot if "
+            f"you trust it."
+        )
+    for magic, fmt in _MAGIC:
+        if head.startswith(magic):
+            if fmt == Format.json_gz and extension == Format.jsonl_gz:
+                return Format.jsonl_gz
+            return fmt
+    return Format.jsonl if extension == Format.jsonl else Format.json
+
+
+def _open_compressed(filename: str, fmt: Format, mode: str):
+    """Open a compressed JSON file in binary mode."""
+    name, extra = _COMPRESSED[fmt]
+    try:
+        module = importlib.import_module(name)
+    except ImportError:
+        raise errors.UnsupportedFormat(
+            fmt,
+            f"install the {name.split('.')[0]} package or "
+            f"sota-extractor[{extra}]",
+        )
+    return module.open(filename, mode)
 
 
 def dumps(tdb: TaskDB) -> str:
@@ -11,7 +107,27 @@ def dumps(tdb: TaskDB) -> str:
     return json.dumps(tdb.export(), indent=2, sort_keys=True)
 
 
-def dump(tdb: TaskDB, output: str, fmt=Format.json, encoding="utf-8"):
+def iter_dumps(tdb: TaskDB) -> Iterator[str]:
+    """Render sota data to json one task at a time.
+
+    The joined chunks are identical to `dumps`, but only a single task is
+    exported and rendered at once, so memory usage is bounded by the size of
+    the largest task.
+
+    Args:
+        tdb (TaskDB): Populated TaskDB instance.
+    """
+    separator = "[\n  "
+    for task in tdb.tasks.values():
+        text = json.dumps(tdb.schema.dump(task), indent=2, sort_keys=True)
+        # JSON strings can not contain a raw newline, so every newline starts
+        # a line that has to be indented by one more level inside the array.
+        yield separator + text.replace("\n", "\n  ")
+        separator = ",\n  "
+    yield "[]" if separator == "[\n  " else "\n]"
+
+
+def dump(tdb: TaskDB, output: str, fmt=None, encoding="utf-8"):
     """Write sota data to file.
 
     Intention of this helper function is to always have maximally similar
@@ -22,33 +138,286 @@ def dump(tdb: TaskDB, output: str, fmt=Format.json, encoding="utf-8"):
         tdb (TaskDB): Populated TaskDB instance.
         output (str): Path to the output file in which the data should be
             serialized.
-        fmt (Format): Serialization format.
+        fmt (Format): Serialization format, by default by the extension of
+            the output file, JSON if it is unknown.
         encoding (str): File encoding.
     """
+    if fmt is None:
+        fmt = format_from_extension(output) or Format.json
+    if isinstance(tdb, LazyTaskDB):
+        # the writers go over `tasks`, which holds only the loaded tasks
+        tdb.load_all()
     if fmt == Format.json:
         with io.open(output, mode="w", encoding=encoding) as fp:
-            fp.write(dumps(tdb))
-    elif fmt == Format.json_gz:
-        with gzip.open(output, mode="wb") as fp:
-            fp.write(dumps(tdb).encode(encoding))
+            fp.writelines(iter_dumps(tdb))
+    elif fmt in _COMPRESSED:
+        raw = _open_compressed(output, fmt, "wb")
+        with io.TextIOWrapper(raw, encoding=encoding) as fp:
+            fp.writelines(iter_dumps(tdb))
+    elif fmt in _LINE_FORMATS:
+        _dump_lines(tdb, output, fmt, encoding)
+    elif fmt == Format.snapshot:
+        _dump_snapshot(tdb, output)
+    elif fmt == Format.mapped:
+        dump_mapped(tdb, output)
     else:
         raise errors.UnsupportedFormat(fmt)
 
 
-def load(filename, fmt=Format.json, encoding="utf-8"):
+def _dump_snapshot(tdb: TaskDB, output: str):
+    with io.open(output, mode="wb") as fp:
+        fp.write(SNAPSHOT_MAGIC + _SNAPSHOT_VERSION.pack(SNAPSHOT_VERSION))
+        pickle.dump(
+            list(tdb.tasks.values()), fp, protocol=pickle.HIGHEST_PROTOCOL
+        )
+
+
+def _load_snapshot(filename: str) -> List[Task]:
+    with io.open(filename, mode="rb") as fp:
+        header = fp.read(len(SNAPSHOT_MAGIC) + _SNAPSHOT_VERSION.size)
+        if len(header) < len(SNAPSHOT_MAGIC) + _SNAPSHOT_VERSION.size or (
+            not header.startswith(SNAPSHOT_MAGIC)
+        ):
+            raise errors.DataError(f"Not a TaskDB snapshot: {filename}")
+        (version,) = _SNAPSHOT_VERSION.unpack_from(header, len(SNAPSHOT_MAGIC))
+        if version != SNAPSHOT_VERSION:
+            raise errors.DataError(
+                f"Unsupported snapshot version {version} in {filename}, "
+                f"expected {SNAPSHOT_VERSION}, dump it again."
+            )
+        try:
+            return pickle.load(fp)
+        except (EOFError, pickle.UnpicklingError) as e:
+            raise errors.DataError(f"Invalid snapshot {filename}: {e}")
+
+
+def index_path(filename: str) -> str:
+    """Get the path of the index of a JSON Lines file."""
+    return f"{filename}.idx"
+
+
+def _task_names(task: Task) -> List[str]:
+    """Get the synonyms and the names and synonyms of all the sub-tasks."""
+    names = list(task.synonyms)
+    for subtask in task.subtasks:
+        names.append(subtask.name)
+        names.extend(_task_names(subtask))
+    return names
+
+
+def _gzip_member(data: bytes) -> bytes:
+    """Compress data into one gzip member, without the modification time."""
+    buffer = io.BytesIO()
+    # gzip.compress takes mtime only since Python 3.8
+    with gzip.GzipFile(fileobj=buffer, mode="wb", mtime=0) as fp:
+        fp.write(data)
+    return buffer.getvalue()
+
+
+def _dump_lines(tdb: TaskDB, output: str, fmt: Format, encoding: str):
+    entries = []
+    offset = 0
+    with io.open(output, mode="wb") as fp:
+        for task in tdb.tasks.values():
+            text = json.dumps(tdb.schema.dump(task), sort_keys=True)
+            line = f"{text}\n".encode(encoding)
+            if fmt == Format.jsonl_gz:
+                line = _gzip_member(line)
+            fp.write(line)
+            entries.append([task.name, offset, len(line), _task_names(task)])
+            offset += len(line)
+
+    index = {
+        "version": INDEX_VERSION,
+        "format": fmt.value,
+        "size": offset,
+        "tasks": entries,
+    }
+    with io.open(index_path(output), mode="w", encoding="utf-8") as fp:
+        json.dump(index, fp, sort_keys=True)
+
+
+def load_index(filename: str) -> Dict[str, Any]:
+    """Load the index of a JSON Lines file.
+
+    The index holds the format of the file, its size and, for every task in
+    the file order, a ``[name, offset, length, names]`` list with the byte
+    range of its line and the names and synonyms it can be found by.
+
+    Args:
+        filename (str): Path to the JSON Lines file, not to the index.
+
+    Raises:
+        DataError: If the index is missing, of another version or stale.
+    """
+    path = index_path(filename)
+    try:
+        with io.open(path, mode="r", encoding="utf-8") as fp:
+            index = json.load(fp)
+    except (OSError, ValueError) as e:
+        raise errors.DataError(f"Could not read the index {path}: {e}")
+    if index.get("version") != INDEX_VERSION:
+        raise errors.DataError(f"Unsupported index version: {path}")
+    if index["size"] != os.path.getsize(filename):
+        raise errors.DataError(f"Index {path} does not match {filename}.")
+    return index
+
+
+def load_range(
+    filename: str, ranges: List[Tuple[int, int]], fmt: Format, encoding="utf-8"
+) -> List[Any]:
+    """Load single tasks from a JSON Lines file by their byte ranges.
+
+    Args:
+        filename (str): Path to the JSON Lines file.
+        ranges: Offsets and lengths of the lines, see `load_index`.
+        fmt (Format): Serialization format.
+        encoding (str): File encoding.
+    """
+    if fmt not in _LINE_FORMATS:
+        raise errors.UnsupportedFormat(fmt)
+    items = []
+    with io.open(filename, mode="rb") as fp:
+        for offset, length in ranges:
+            fp.seek(offset)
+            line = fp.read(length)
+            if fmt == Format.jsonl_gz:
+                line = gzip.decompress(line)
+            items.append(json.loads(line.decode(encoding)))
+    return items
+
+
+def load(filename, fmt=None, encoding="utf-8"):
     """Load sota data from file.
 
+    Snapshots and mapped files are loaded as `Task` instances, the other
+    formats as dictionaries, both can be passed to `TaskDB.load_tasks`.
+    Snapshots are pickles, they are never detected and have to be loaded with
+    `Format.snapshot`, load only the ones you trust. Open mapped files with
+    `MappedTaskDB` to keep the tasks in the mapped file.
+
     Args:
         filename (str): Path to the file from which the data should be
             deserialized.
-        fmt (Format): Serialization format.
+        fmt (Format): Serialization format, detected by default, see
+            `detect_format`.
         encoding (str): File encoding.
     """
+    if fmt is None:
+        fmt = detect_format(filename)
     if fmt == Format.json:
         with io.open(filename, mode="r", encoding=encoding) as fp:
             return json.load(fp)
-    elif fmt == Format.json_gz:
-        with gzip.open(filename, mode="rb") as fp:
+    elif fmt in _COMPRESSED:
+        with _open_compressed(filename, fmt, "rb") as fp:
             return json.loads(fp.read().decode(encoding))
+    elif fmt in _LINE_FORMATS:
+        return list(iter_load(filename, fmt=fmt, encoding=encoding))
+    elif fmt == Format.snapshot:
+        return _load_snapshot(filename)
+    elif fmt == Format.mapped:
+        return list(MappedTaskDB(filename).tasks.values())
     else:
         raise errors.UnsupportedFormat(fmt)
+
+
+def iter_load(filename, fmt=None, encoding="utf-8") -> Iterator[Any]:
+    """Lazily load sota data from file.
+
+    Unlike `load` this never holds the whole document in memory. A JSON file
+    must contain a top-level JSON array, its items, or the lines of a JSON
+    Lines file, are yielded one at a time, so memory usage is bounded by the
+    size of the largest item.
+
+    Args:
+        filename (str): Path to the file from which the data should be
+            deserialized.
+        fmt (Format): Serialization format, detected by default, see
+            `detect_format`.
+        encoding (str): File encoding.
+    """
+    if fmt is None:
+        fmt = detect_format(filename)
+    if fmt in (Format.json, Format.jsonl):
+        fp = io.open(filename, mode="r", encoding=encoding)
+    elif fmt == Format.jsonl_gz:
+        fp = gzip.open(filename, mode="rt", encoding=encoding)
+    elif fmt in _COMPRESSED:
+        fp = io.TextIOWrapper(
+            _open_compressed(filename, fmt, "rb"), encoding=encoding
+        )
+    else:
+        raise errors.UnsupportedFormat(fmt)
+    if fmt in _LINE_FORMATS:
+        return _iter_lines(fp)
+    return _iter_file(fp)
+
+
+def _iter_file(fp) -> Iterator[Any]:
+    with fp:
+        yield from iter_array(fp)
+
+
+def _iter_lines(fp) -> Iterator[Any]:
+    with fp:
+        for line in fp:
+            if line.strip():
+                yield json.loads(line)
+
+
+def iter_array(fp, chunk_size=CHUNK_SIZE) -> Iterator[Any]:
+    """Iterate over the items of a JSON array read from a text stream.
+
+    Args:
+        fp: File-like object opened in text mode.
+        chunk_size (int): Number of characters to read at once.
+    """
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+    eof = False
+    started = False
+    expect_value = True
+    first = True
+
+    while True:
+        pos = _WHITESPACE.match(buf, pos).end()
+        if pos == len(buf) and not eof:
+            chunk = fp.read(chunk_size)
+            buf, pos, eof = chunk, 0, chunk == ""
+            continue
+        if pos == len(buf):
+            raise errors.DataError("Unexpected end of the JSON array.")
+
+        char = buf[pos]
+        if not started:
+            if char != "[":
+                raise errors.DataError("Expected a top-level JSON array.")
+            started = True
+            pos += 1
+        elif char == "]" and (first or not expect_value):
+            return
+        elif expect_value:
+            try:
+                item, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError as e:
+                if eof:
+                    raise errors.DataError(f"Invalid JSON: {e}")
+                end = len(buf)
+            if end == len(buf) and not eof:
+                # The value is incomplete or might continue in the next
+                # chunk (e.g. a number), read more and try again.
+                chunk = fp.read(chunk_size)
+                buf, pos, eof = buf[pos:] + chunk, 0, chunk == ""
+                continue
+            yield item
+            pos = end
+            expect_value = False
+            first = False
+        elif char == ",":
+            expect_value = True
+            pos += 1
+        else:
+            raise errors.DataError(
+                f"Unexpected character in the JSON array: {char!r}"
+            )
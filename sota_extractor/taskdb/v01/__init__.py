@@ -1,4 +1,15 @@
-__all__ = ["Link", "SotaRow", "Sota", "Dataset", "Task", "TaskDB"]
+__all__ = [
+    "Link",
+    "SotaRow",
+    "Sota",
+    "Dataset",
+    "Task",
+    "TaskDB",
+    "LazyTaskDB",
+    "MappedTaskDB",
+]
 
 from sota_extractor.taskdb.v01.models import Link, SotaRow, Sota, Dataset, Task
 from sota_extractor.taskdb.v01.taskdb import TaskDB
+from sota_extractor.taskdb.v01.lazy import LazyTaskDB
+from sota_extractor.taskdb.v01.mapped import MappedTaskDB
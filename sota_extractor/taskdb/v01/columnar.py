@@ -0,0 +1,135 @@
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from sota_extractor.taskdb.v01.metrics import (
+    Direction,
+    MetricValue,
+    metric_direction,
+    normalize,
+)
+from sota_extractor.taskdb.v01.models import SotaRow, Sota
+
+
+def parse_value(metric: str, value: Any) -> float:
+    """Parse a metric value, NaN if it is not a number."""
+    return _float(normalize(metric, value))
+
+
+def _float(value: Optional[MetricValue]) -> float:
+    return np.nan if value is None or value.value is None else value.value
+
+
+class ColumnarSota:
+    """Columnar storage of a sota table.
+
+    Every metric is a float array of the parsed values, with a mask of the
+    values that could not be parsed (NaN in the array), so the leaderboard
+    queries run vectorized. By default the queries use the metric direction
+    (see `metric_direction`), so e.g. the best error rate is the lowest one.
+    The rows are kept, so the table converts back to a `Sota` with the raw
+    values.
+
+    Args:
+        metrics: Metric names, in table order.
+        rows: Table rows.
+    """
+
+    def __init__(self, metrics: List[str], rows: List[SotaRow]):
+        self.metrics = list(metrics)
+        self.rows = rows
+        self.model_names = np.array(
+            [r.model_name for r in rows], dtype=object
+        )
+        self.paper_titles = np.array(
+            [r.paper_title for r in rows], dtype=object
+        )
+        self.paper_dates = np.array(
+            [r.paper_date for r in rows], dtype="datetime64[D]"
+        )
+        self.values: Dict[str, np.ndarray] = {}
+        self.masks: Dict[str, np.ndarray] = {}
+        for metric in self.metrics:
+            values = np.fromiter(
+                (_float(r.metric_values.get(metric)) for r in rows),
+                dtype=float,
+                count=len(rows),
+            )
+            self.values[metric] = values
+            self.masks[metric] = np.isnan(values)
+
+    @classmethod
+    def from_sota(cls, sota: Sota) -> "ColumnarSota":
+        return cls(sota.metrics, sota.rows)
+
+    def to_sota(self) -> Sota:
+        return Sota(metrics=list(self.metrics), rows=list(self.rows))
+
+    def __len__(self):
+        return len(self.rows)
+
+    def column(self, metric: str) -> np.ma.MaskedArray:
+        """Get the parsed values of a metric as a masked array."""
+        return np.ma.MaskedArray(self.values[metric], mask=self.masks[metric])
+
+    def _scores(
+        self, metric: str, higher_is_better: Optional[bool]
+    ) -> np.ndarray:
+        """Get the values negated if needed, so that higher is better."""
+        values = self.values[metric]
+        if higher_is_better is None:
+            higher_is_better = metric_direction(metric) == Direction.higher
+        return values if higher_is_better else -values
+
+    def best(
+        self, metric: str, higher_is_better: Optional[bool] = None
+    ) -> Optional[int]:
+        """Get the index of the best row, first one on ties.
+
+        Returns:
+            Row index or None if no value of the metric could be parsed.
+        """
+        if self.masks[metric].all():
+            return None
+        return int(np.nanargmax(self._scores(metric, higher_is_better)))
+
+    def best_per_metric(
+        self, higher_is_better: Optional[bool] = None
+    ) -> Dict[str, Optional[int]]:
+        """Get the index of the best row for every metric."""
+        return {
+            metric: self.best(metric, higher_is_better)
+            for metric in self.metrics
+        }
+
+    def rank(
+        self, metric: str, higher_is_better: Optional[bool] = None
+    ) -> np.ndarray:
+        """Get the indexes of the rows with a value, from the best one.
+
+        Rows with equal values keep the table order.
+        """
+        scores = self._scores(metric, higher_is_better)
+        (indexes,) = np.nonzero(~self.masks[metric])
+        order = np.argsort(-scores[indexes], kind="stable")
+        return indexes[order]
+
+    def time_series(
+        self, metric: str, higher_is_better: Optional[bool] = None
+    ) -> np.ndarray:
+        """Get the indexes of the rows that improved the state of the art.
+
+        Rows with a value and a paper date are sorted by date, and the rows
+        better than all the rows before them are returned in date order.
+        """
+        scores = self._scores(metric, higher_is_better)
+        (indexes,) = np.nonzero(
+            ~(self.masks[metric] | np.isnat(self.paper_dates))
+        )
+        indexes = indexes[
+            np.argsort(self.paper_dates[indexes], kind="stable")
+        ]
+        scores = scores[indexes]
+        # best score of all the rows before each row
+        previous = np.maximum.accumulate(np.concatenate([[-np.inf], scores]))
+        return indexes[scores > previous[:-1]]
@@ -0,0 +1,100 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sota_extractor.consts import Format
+from sota_extractor.taskdb.v01.models import Dataset, Task
+from sota_extractor.taskdb.v01.taskdb import TaskDB, _add
+
+
+class LazyTaskDB(TaskDB):
+    """TaskDB loading the tasks of a JSON Lines file only when asked for.
+
+    The sidecar index of the file maps the top-level tasks to the byte ranges
+    of their lines and lists the names and synonyms of their sub-tasks, so
+    `get_task` reads and parses only the lines of the tasks that can match
+    the name. `tasks` holds just the tasks loaded so far, in the order they
+    were loaded. The methods going over all the tasks, like `export`, and
+    `serialization.dump` load the rest first.
+
+    Args:
+        filename (str): Path to a file written with `Format.jsonl` or
+            `Format.jsonl_gz`.
+        encoding (str): File encoding.
+    """
+
+    def __init__(self, filename: str, encoding: str = "utf-8"):
+        from sota_extractor.serialization import load_index
+
+        super().__init__()
+        index = load_index(filename)
+        self.filename = filename
+        self.encoding = encoding
+        self.fmt = Format(index["format"])
+        self.task_names = [entry[0] for entry in index["tasks"]]
+        # Byte ranges of the top-level tasks that are not loaded yet.
+        self._ranges: Dict[str, Tuple[int, int]] = {}
+        # Names of the top-level tasks by the names and synonyms, exact and
+        # case-folded, of the tasks and sub-tasks in the file.
+        self._owners: Dict[str, List[str]] = {}
+        for name, offset, length, names in index["tasks"]:
+            self._ranges[name] = (offset, length)
+            for key in {name, *names}:
+                _add(self._owners, key, name)
+                _add(self._owners, key.casefold(), name)
+
+    def load(self, names: Iterable[str]):
+        """Load the top-level tasks by name, if they are not loaded yet."""
+        from sota_extractor.serialization import load_range
+
+        ranges = sorted(
+            self._ranges[name] for name in set(names) if name in self._ranges
+        )
+        if ranges:
+            self.load_tasks(
+                data=load_range(
+                    self.filename, ranges, fmt=self.fmt, encoding=self.encoding
+                )
+            )
+
+    def load_all(self):
+        """Load all the tasks that are not loaded yet."""
+        self.load(list(self._ranges))
+
+    def get_task(self, name: str) -> Optional[Task]:
+        """Get a task or a sub-task by name, loading it if needed.
+
+        See `TaskDB.get_task` for the precedence of the matching tasks.
+        """
+        if name in self._ranges:
+            self.load([name])
+        elif name not in self.tasks:
+            owners = self._owners.get(name, [])
+            self.load(owners + self._owners.get(name.casefold(), []))
+        return super().get_task(name)
+
+    def add_task(self, task: Task):
+        """Add a top-level task by name, it replaces the task in the file."""
+        self._ranges.pop(task.name, None)
+        super().add_task(task)
+
+    def remove_task(self, name: str) -> Optional[Task]:
+        """Remove a task or a sub-task, with all its sub-tasks, by name."""
+        if name in self._ranges:
+            self.load([name])
+        elif name not in self.tasks:
+            self.load(self._owners.get(name, []))
+        return super().remove_task(name)
+
+    def tasks_with_sota(self) -> List[Task]:
+        """Load all the tasks and extract the ones with SOTA tables."""
+        self.load_all()
+        return super().tasks_with_sota()
+
+    def datasets_with_sota(self) -> List[Dataset]:
+        """Load all the tasks and extract the datasets with SOTA tables."""
+        self.load_all()
+        return super().datasets_with_sota()
+
+    def export(self) -> List[Dict[str, Any]]:
+        """Load all the tasks and export them in Dict format."""
+        self.load_all()
+        return super().export()
@@ -0,0 +1,113 @@
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
+
+from sota_extractor.taskdb.v01.models import Link, SotaRow, Sota, Dataset, Task
+
+
+DATE_FORMAT = "%Y-%m-%d"
+
+
+def load_date(value: Any) -> Optional[date]:
+    if value is None or isinstance(value, date):
+        return value
+    return datetime.strptime(value, DATE_FORMAT).date()
+
+
+class TaskLoader:
+    """Builds the models from parsed json without schema validation.
+
+    Mirrors the defaults and conversions of `TaskSchema`. Strings repeated
+    across rows and tasks (metric names, model names, paper titles and urls,
+    link titles) are interned in `strings`, so that a single copy of each is
+    kept.
+
+    Args:
+        strings: String table shared between loaders, e.g. by all the loads
+            into the same TaskDB.
+    """
+
+    def __init__(self, strings: Optional[Dict[str, str]] = None):
+        self.strings = {} if strings is None else strings
+
+    def intern(self, value: Any) -> Any:
+        if isinstance(value, str):
+            return self.strings.setdefault(value, value)
+        return value
+
+    def load_link(self, data: Dict[str, Any]) -> Link:
+        return Link(
+            title=self.intern(data.get("title", "")),
+            url=self.intern(data.get("url", "")),
+        )
+
+    def load_links(self, data: Optional[List[Dict[str, Any]]]) -> List[Link]:
+        return [self.load_link(link) for link in data] if data else []
+
+    def load_sota_row(self, data: Dict[str, Any]) -> SotaRow:
+        intern = self.intern
+        return SotaRow(
+            model_name=intern(data["model_name"]),
+            paper_title=intern(data.get("paper_title", "")),
+            paper_url=intern(data.get("paper_url", "")),
+            paper_date=load_date(data.get("paper_date")),
+            code_links=self.load_links(data.get("code_links")),
+            model_links=self.load_links(data.get("model_links")),
+            metrics={
+                intern(name): value
+                for name, value in data.get("metrics", {}).items()
+            },
+            uses_additional_data=data.get("uses_additional_data", False),
+        )
+
+    def load_sota(self, data: Dict[str, Any]) -> Sota:
+        return Sota(
+            metrics=[self.intern(name) for name in data.get("metrics", ())],
+            rows=[self.load_sota_row(row) for row in data.get("rows", ())],
+        )
+
+    def load_dataset(self, data: Dict[str, Any]) -> Dataset:
+        if "dataset" in data:
+            name, is_subdataset = data["dataset"], False
+        elif "subdataset" in data:
+            name, is_subdataset = data["subdataset"], True
+        else:
+            name, is_subdataset = "", False
+
+        dataset = Dataset(
+            name=name,
+            is_subdataset=is_subdataset,
+            description=data.get("description", ""),
+            sota=self.load_sota(data["sota"]) if "sota" in data else Sota(),
+            subdatasets=[
+                self.load_dataset(d) for d in data.get("subdatasets", ())
+            ],
+            links=self.load_links(data.get("dataset_links")),
+            citations=self.load_links(data.get("dataset_citations")),
+        )
+        for subdataset in dataset.subdatasets:
+            subdataset.parent = dataset
+        return dataset
+
+    def load_task(self, data: Dict[str, Any]) -> Task:
+        source_link = data.get("source_link")
+        task = Task(
+            name=data["task"],
+            description=data.get("description", ""),
+            categories=[
+                self.intern(name) for name in data.get("categories", ())
+            ],
+            datasets=[self.load_dataset(d) for d in data.get("datasets", ())],
+            subtasks=[self.load_task(t) for t in data.get("subtasks", ())],
+            synonyms=list(data.get("synonyms", ())),
+            source_link=(
+                None if source_link is None else self.load_link(source_link)
+            ),
+        )
+        for subtask in task.subtasks:
+            subtask.parent = task
+        return task
+
+
+def load_task(data: Dict[str, Any]) -> Task:
+    """Build a task from parsed json without schema validation."""
+    return TaskLoader().load_task(data)
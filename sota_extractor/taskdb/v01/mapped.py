@@ -0,0 +1,498 @@
+import io
+import json
+import mmap
+import struct
+import datetime
+from collections.abc import Mapping, Sequence
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from sota_extractor.errors import DataError
+from sota_extractor.taskdb.v01.models import Dataset, Link, Sota, SotaRow, Task
+from sota_extractor.taskdb.v01.schemas import TaskSchema
+from sota_extractor.taskdb.v01.taskdb import (
+    TaskDB,
+    find_sota_datasets,
+    find_sota_tasks,
+)
+
+# Header of the mapped files, followed by the version and the length of the
+# JSON table of contents.
+MAPPED_MAGIC = b"SOTAMAP"
+_PREFIX = struct.Struct("<HI")
+
+# Version of the mapped files, bump it whenever their layout changes.
+MAPPED_VERSION = 1
+
+# Alignment of the arrays in the file.
+_ALIGN = 8
+
+# Metric values that are strings are stored as they are, the others (numbers
+# or null) as JSON.
+_STR, _JSON = 0, 1
+
+_ID = np.dtype("<i4")
+_OFFSET = np.dtype("<i8")
+_FLAG = np.dtype("u1")
+
+
+class _Writer:
+    """Flatten tasks into arrays."""
+
+    def __init__(self):
+        self.strings: Dict[str, int] = {}
+        self.columns: Dict[str, List[int]] = {}
+        self.dtypes: Dict[str, np.dtype] = {}
+
+    def string(self, value: Optional[str]) -> int:
+        """Get the id of a string in the string table, -1 for None."""
+        if value is None:
+            return -1
+        return self.strings.setdefault(value, len(self.strings))
+
+    def append(self, name: str, value: int, dtype: np.dtype = _ID):
+        self.dtypes.setdefault(name, dtype)
+        self.columns.setdefault(name, []).append(value)
+
+    def append_list(self, name: str, values: List[int]):
+        """Append a list, its items are in `name`, its end in the offsets."""
+        self.dtypes.setdefault(name, _ID)
+        items = self.columns.setdefault(name, [])
+        items.extend(values)
+        self.append(f"{name}_offsets", len(items), _OFFSET)
+
+    def link(self, link: Optional[Link]) -> int:
+        if link is None:
+            return -1
+        self.append("link_title", self.string(link.title))
+        self.append("link_url", self.string(link.url))
+        return len(self.columns["link_url"]) - 1
+
+    def links(self, name: str, links: List[Link]):
+        self.append_list(name, [self.link(link) for link in links])
+
+    def row(self, row: SotaRow):
+        self.append("row_model_name", self.string(row.model_name))
+        self.append("row_paper_title", self.string(row.paper_title))
+        self.append("row_paper_url", self.string(row.paper_url))
+        if row.paper_date is not None and not isinstance(
+            row.paper_date, datetime.date
+        ):
+            raise DataError(f"Invalid paper date: {row.paper_date!r}")
+        self.append(
+            "row_paper_date",
+            0 if row.paper_date is None else row.paper_date.toordinal(),
+        )
+        self.append(
+            "row_uses_additional_data", row.uses_additional_data, _FLAG
+        )
+        self.links("row_code_links", row.code_links)
+        self.links("row_model_links", row.model_links)
+        names, values = [], []
+        for name, value in row.metrics.items():
+            names.append(self.string(name))
+            if isinstance(value, str):
+                values.append(self.string(value))
+                self.append("metric_kind", _STR, _FLAG)
+            else:
+                values.append(self.string(json.dumps(value)))
+                self.append("metric_kind", _JSON, _FLAG)
+        self.append_list("row_metric_names", names)
+        self.append_list("row_metric_values", values)
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        encoded = [s.encode("utf-8") for s in self.strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=_OFFSET)
+        np.cumsum([len(s) for s in encoded], out=offsets[1:])
+        arrays = {
+            "strings": np.frombuffer(b"".join(encoded), dtype=_FLAG),
+            "string_offsets": offsets,
+        }
+        for name, values in self.columns.items():
+            arrays[name] = np.array(values, dtype=self.dtypes[name])
+        return arrays
+
+
+def _flatten(tasks: List[Task], parent: int, out: List[Tuple[Task, int]]):
+    """Collect the tasks and sub-tasks, with the index of their parent."""
+    for task in tasks:
+        out.append((task, parent))
+        _flatten(task.subtasks, len(out) - 1, out)
+
+
+def _flatten_datasets(datasets: List[Dataset], out: List[Dataset]):
+    for dataset in datasets:
+        out.append(dataset)
+        _flatten_datasets(dataset.subdatasets, out)
+
+
+def dump_mapped(tdb: TaskDB, output: str):
+    """Write the tasks to a file that can be opened with `MappedTaskDB`.
+
+    The strings are stored once in a string table, the tasks, datasets, rows
+    and links are stored column by column, in arrays of string ids or of ids
+    of other items, and every list is stored as a flat array of items with
+    an array of the offsets where the list of each item ends.
+
+    Args:
+        tdb (TaskDB): Populated TaskDB instance.
+        output (str): Path to the output file.
+    """
+    flat: List[Tuple[Task, int]] = []
+    _flatten(list(tdb.tasks.values()), -1, flat)
+    tasks = [task for task, _ in flat]
+    task_ids = {id(task): i for i, task in enumerate(tasks)}
+    datasets: List[Dataset] = []
+    for task in tasks:
+        _flatten_datasets(task.datasets, datasets)
+    dataset_ids = {id(dataset): i for i, dataset in enumerate(datasets)}
+
+    w = _Writer()
+    w.append_list("top_tasks", [i for i, (_, p) in enumerate(flat) if p < 0])
+    for task, parent in flat:
+        w.append("task_name", w.string(task.name))
+        w.append("task_description", w.string(task.description))
+        w.append("task_parent", parent)
+        w.append("task_source_link", w.link(task.source_link))
+        w.append_list(
+            "task_categories", [w.string(c) for c in task.categories]
+        )
+        w.append_list("task_synonyms", [w.string(s) for s in task.synonyms])
+        w.append_list(
+            "task_datasets", [dataset_ids[id(d)] for d in task.datasets]
+        )
+        w.append_list(
+            "task_subtasks", [task_ids[id(t)] for t in task.subtasks]
+        )
+
+    rows = 0
+    for dataset in datasets:
+        w.append("dataset_name", w.string(dataset.name))
+        w.append("dataset_description", w.string(dataset.description))
+        w.append("dataset_is_subdataset", dataset.is_subdataset, _FLAG)
+        w.append_list(
+            "dataset_metrics", [w.string(m) for m in dataset.sota.metrics]
+        )
+        w.append_list(
+            "dataset_subdatasets",
+            [dataset_ids[id(d)] for d in dataset.subdatasets],
+        )
+        w.links("dataset_links", dataset.links)
+        w.links("dataset_citations", dataset.citations)
+        # the rows of a dataset are consecutive
+        for row in dataset.sota.rows:
+            w.row(row)
+        rows += len(dataset.sota.rows)
+        w.append("dataset_rows_offsets", rows, _OFFSET)
+
+    # lookup indexes, sorted by the key and then in the order of the tasks,
+    # which is the order in which TaskDB indexes them
+    indexes: Dict[str, List] = {"names": [], "synonyms": [], "folded": []}
+    for i, task in enumerate(tasks):
+        indexes["names"].append((task.name, i))
+        indexes["folded"].append((task.name.casefold(), i))
+        for synonym in task.synonyms:
+            indexes["synonyms"].append((synonym, i))
+            indexes["folded"].append((synonym.casefold(), i))
+    for name, entries in indexes.items():
+        for key, i in sorted(set(entries)):
+            w.append(f"index_{name}_keys", w.string(key))
+            w.append(f"index_{name}_tasks", i)
+
+    arrays = w.arrays()
+    toc, offset = {}, 0
+    for name, array in arrays.items():
+        toc[name] = [array.dtype.str, offset, len(array)]
+        offset += -(-array.nbytes // _ALIGN) * _ALIGN
+    header = json.dumps({"arrays": toc}, sort_keys=True).encode("utf-8")
+    prefix = MAPPED_MAGIC + _PREFIX.pack(MAPPED_VERSION, len(header))
+
+    with io.open(output, mode="wb") as fp:
+        fp.write(prefix + header)
+        fp.write(b"\0" * (-fp.tell() % _ALIGN))
+        for array in arrays.values():
+            fp.write(array.tobytes())
+            fp.write(b"\0" * (-array.nbytes % _ALIGN))
+
+
+class MappedRows(Sequence):
+    """Read-only list of the rows of a sota table, built when accessed."""
+
+    def __init__(self, tdb: "MappedTaskDB", start: int, stop: int):
+        self._tdb = tdb
+        self._rows = range(start, stop)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._tdb._row(i) for i in self._rows[index]]
+        return self._tdb._row(self._rows[index])
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (list, MappedRows)):
+            return len(self) == len(other) and all(
+                a == b for a, b in zip(self, other)
+            )
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"MappedRows({list(self)!r})"
+
+
+class _MappedTasks(Mapping):
+    """Read-only mapping of the top-level tasks by name."""
+
+    def __init__(self, tdb: "MappedTaskDB"):
+        self._tdb = tdb
+
+    def __getitem__(self, name: str) -> Task:
+        for i in self._tdb._lookup("names", name):
+            if self._tdb._array("task_parent")[i] < 0:
+                return self._tdb._task(i)
+        raise KeyError(name)
+
+    def __iter__(self) -> Iterator[str]:
+        for i in self._tdb._list("top_tasks", 0):
+            yield self._tdb._string(self._tdb._array("task_name")[i])
+
+    def __len__(self) -> int:
+        return len(self._tdb._list("top_tasks", 0))
+
+
+class MappedTaskDB:
+    """Read-only TaskDB over a memory-mapped file written by `dump_mapped`.
+
+    All the data stays in the mapped file, which forked processes share, and
+    `Task` objects are built only when a task is accessed, with the rows of
+    its sota tables built one by one when they are accessed, see
+    `MappedRows`. The built tasks are kept, so a task is always the same
+    object. Tasks can not be added, removed or modified.
+
+    Args:
+        filename (str): Path to the mapped file.
+    """
+
+    def __init__(self, filename: str):
+        with io.open(filename, mode="rb") as fp:
+            try:
+                self._mmap = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as e:
+                raise DataError(f"Not a mapped TaskDB file: {filename} ({e})")
+        try:
+            self._arrays = self._read_arrays(filename)
+        except Exception:
+            self._mmap.close()
+            raise
+        self.schema = TaskSchema()
+        self.tasks = _MappedTasks(self)
+        self._tasks: Dict[int, Task] = {}
+
+    def _read_arrays(self, filename: str) -> Dict[str, np.ndarray]:
+        start = len(MAPPED_MAGIC) + _PREFIX.size
+        if len(self._mmap) < start or (
+            self._mmap[: len(MAPPED_MAGIC)] != MAPPED_MAGIC
+        ):
+            raise DataError(f"Not a mapped TaskDB file: {filename}")
+        version, size = _PREFIX.unpack_from(self._mmap, len(MAPPED_MAGIC))
+        if version != MAPPED_VERSION:
+            raise DataError(
+                f"Unsupported mapped file version {version} in {filename}, "
+                f"expected {MAPPED_VERSION}, dump it again."
+            )
+        header = json.loads(self._mmap[start : start + size].decode("utf-8"))
+        data = start + size + (-(start + size) % _ALIGN)
+        return {
+            name: np.frombuffer(
+                self._mmap, dtype=dtype, count=count, offset=data + offset
+            )
+            for name, (dtype, offset, count) in header["arrays"].items()
+        }
+
+    def close(self):
+        """Unmap the file.
+
+        The tasks built so far can still be used, but not the rows of their
+        sota tables.
+        """
+        self._arrays.clear()
+        self._mmap.close()
+
+    def __enter__(self) -> "MappedTaskDB":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _array(self, name: str) -> np.ndarray:
+        try:
+            return self._arrays[name]
+        except KeyError:
+            # columns of items that do not occur in the file are not stored
+            return np.zeros(0, dtype=_OFFSET if "offsets" in name else _ID)
+
+    def _string(self, i: int) -> Optional[str]:
+        if i < 0:
+            return None
+        offsets = self._arrays["string_offsets"]
+        data = self._arrays["strings"][offsets[i] : offsets[i + 1]]
+        return data.tobytes().decode("utf-8")
+
+    def _range(self, name: str, i: int) -> Tuple[int, int]:
+        """Get the start and the end of the i-th list in `name`."""
+        offsets = self._array(f"{name}_offsets")
+        return int(offsets[i - 1]) if i else 0, int(offsets[i])
+
+    def _list(self, name: str, i: int) -> np.ndarray:
+        start, stop = self._range(name, i)
+        return self._array(name)[start:stop]
+
+    def _strings(self, name: str, i: int) -> List[str]:
+        return [self._string(s) for s in self._list(name, i)]
+
+    def _lookup(self, index: str, key: str) -> List[int]:
+        """Get the ids of the tasks with the key in an index."""
+        keys = self._array(f"index_{index}_keys")
+        lo, hi = 0, len(keys)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._string(keys[mid]) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        tasks = []
+        while lo < len(keys) and self._string(keys[lo]) == key:
+            tasks.append(int(self._array(f"index_{index}_tasks")[lo]))
+            lo += 1
+        return tasks
+
+    def _link(self, i: int) -> Optional[Link]:
+        if i < 0:
+            return None
+        return Link(
+            title=self._string(self._array("link_title")[i]),
+            url=self._string(self._array("link_url")[i]),
+        )
+
+    def _links(self, name: str, i: int) -> List[Link]:
+        return [self._link(link) for link in self._list(name, i)]
+
+    def _row(self, i: int) -> SotaRow:
+        start, stop = self._range("row_metric_values", i)
+        metrics: Dict[str, Any] = {}
+        for name, value, kind in zip(
+            self._list("row_metric_names", i),
+            self._array("row_metric_values")[start:stop],
+            self._array("metric_kind")[start:stop],
+        ):
+            value = self._string(value)
+            metrics[self._string(name)] = (
+                value if kind == _STR else json.loads(value)
+            )
+        date = int(self._array("row_paper_date")[i])
+        return SotaRow(
+            model_name=self._string(self._array("row_model_name")[i]),
+            paper_title=self._string(self._array("row_paper_title")[i]),
+            paper_url=self._string(self._array("row_paper_url")[i]),
+            paper_date=datetime.date.fromordinal(date) if date else None,
+            code_links=self._links("row_code_links", i),
+            model_links=self._links("row_model_links", i),
+            metrics=metrics,
+            uses_additional_data=bool(
+                self._array("row_uses_additional_data")[i]
+            ),
+        )
+
+    def _dataset(self, i: int, parent: Optional[Dataset]) -> Dataset:
+        dataset = Dataset(
+            name=self._string(self._array("dataset_name")[i]),
+            is_subdataset=bool(self._array("dataset_is_subdataset")[i]),
+            description=self._string(self._array("dataset_description")[i]),
+            parent=parent,
+            sota=Sota(
+                metrics=self._strings("dataset_metrics", i),
+                rows=MappedRows(self, *self._range("dataset_rows", i)),
+            ),
+            links=self._links("dataset_links", i),
+            citations=self._links("dataset_citations", i),
+        )
+        dataset.subdatasets = [
+            self._dataset(d, dataset)
+            for d in self._list("dataset_subdatasets", i)
+        ]
+        return dataset
+
+    def _task(self, i: int) -> Task:
+        """Get a task, building it with its parents and sub-tasks."""
+        i = int(i)
+        if i in self._tasks:
+            return self._tasks[i]
+        parent = int(self._array("task_parent")[i])
+        if parent >= 0:
+            # builds the sub-tasks of the parent as well
+            self._task(parent)
+            return self._tasks[i]
+        return self._build_task(i, None)
+
+    def _build_task(self, i: int, parent: Optional[Task]) -> Task:
+        task = Task(
+            name=self._string(self._array("task_name")[i]),
+            description=self._string(self._array("task_description")[i]),
+            parent=parent,
+            categories=self._strings("task_categories", i),
+            datasets=[
+                self._dataset(d, None) for d in self._list("task_datasets", i)
+            ],
+            synonyms=self._strings("task_synonyms", i),
+            source_link=self._link(self._array("task_source_link")[i]),
+        )
+        self._tasks[i] = task
+        task.subtasks = [
+            self._build_task(int(t), task)
+            for t in self._list("task_subtasks", i)
+        ]
+        return task
+
+    def get_task(self, name: str) -> Optional[Task]:
+        """Get a task or a sub-task by name.
+
+        Same precedence as `TaskDB.get_task`.
+        """
+        names = self._lookup("names", name)
+        for i in names:
+            if self._array("task_parent")[i] < 0:
+                return self._task(i)
+        for tasks in (
+            names,
+            self._lookup("synonyms", name),
+            self._lookup("folded", name.casefold()),
+        ):
+            if tasks:
+                return self._task(tasks[0])
+        return None
+
+    def tasks_with_sota(self) -> List[Task]:
+        """Extract all tasks with SOTA tables.
+
+        This includes both the top-level and sub-tasks.
+        """
+        sota_tasks: List[Task] = []
+        for task in self.tasks.values():
+            find_sota_tasks(task, sota_tasks)
+        return sota_tasks
+
+    def datasets_with_sota(self) -> List[Dataset]:
+        """Extract all datasets with SOTA tables.
+
+        This includes both the top-level and sub-tasks.
+        """
+        sota_datasets: List[Dataset] = []
+        for task in self.tasks.values():
+            find_sota_datasets(task, sota_datasets)
+        return sota_datasets
+
+    def export(self) -> List[Dict[str, Any]]:
+        """Export the whole of TaskDB into a list of tasks in Dict format."""
+        return self.schema.dump(self.tasks.values(), many=True)
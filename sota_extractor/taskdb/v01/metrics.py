@@ -0,0 +1,183 @@
+import re
+import enum
+import functools
+from dataclasses import dataclass
+from typing import Any, Optional, Tuple
+
+from sota_extractor.taskdb.v01.slots import slotted
+
+
+class Direction(str, enum.Enum):
+    """Which metric values are better."""
+
+    higher = "higher"
+    lower = "lower"
+
+
+# Metrics for which lower values are better. The metric name has to be one
+# of these phrases or end with one, e.g. "Top-1 Error" or "Test perplexity",
+# but not "Error analysis F1" or "Time-aware F1".
+LOWER_IS_BETTER = re.compile(
+    r"(?:^|[\s_-])(?:"
+    r"error(?: rate)?|err|loss|perplexity|ppl|wer|cer|entropy|mae|mse|rmse|"
+    r"bits? per (?:char(?:acter)?|dim(?:ension)?|byte|pixel|word)|bpc|bpd|"
+    r"fid|params|parameters|latency|time"
+    r")$"
+)
+# Abbreviations that are too ambiguous as a part of a name, they have to be
+# the whole name, e.g. VI is the variation of information.
+LOWER_IS_BETTER_NAMES = {"vi"}
+# Parts of the names that do not change the metric, e.g. "(BPC)" or "%".
+_NAME_NOISE = re.compile(r"\([^)]*\)|[%*?:.]")
+
+# A number, with optional thousands separators (10,000) and exponent (1e-3).
+NUMBER = (
+    r"[-+\u2212]?"
+    r"(?:\d{1,3}(?:,\d{3})+(?![\d,])(?:\.\d+)?|\d+(?:\.\d*)?|\.\d+)"
+    r"(?:[eE][-+\u2212]?\d+)?"
+)
+# A number with an optional scale right after it (1.2M) or unit (86.1%,
+# 3 ms, 3 m).
+QUANTITY = re.compile(
+    rf"\s*(?P<number>{NUMBER})"
+    r"(?:(?P<scale>[kKmMbB])(?![^\W\d_])|\s*(?P<unit>%|[^\W\d_]+))?"
+)
+UNCERTAINTY = re.compile(rf"\s*(?:\u00b1|\+/?-)\s*(?P<number>{NUMBER})\s*%?")
+# Separator of multiple numbers, a comma only if followed by a space, so
+# that a misplaced thousands separator is not read as two numbers.
+SEPARATOR = re.compile(r"\s*(?:[/;]|,(?=\s))|\s+")
+# Footnote marks and markdown emphasis.
+MARKS = "*+?\u2020\u2021_"
+REMARK = re.compile(r"\s*(\(.*\))?\s*")
+SCALES = {"k": 1e3, "m": 1e6, "b": 1e9}
+
+# value, unit, uncertainty and the other numbers
+ParsedValue = Tuple[Optional[float], str, Optional[float], Tuple[float, ...]]
+
+
+@slotted
+@dataclass(frozen=True)
+class MetricValue:
+    """Normalized metric value.
+
+    Attributes:
+        raw: The original value, as it was scraped.
+        value: The (first) parsed number or None if the value is not a
+            number. Scales are applied ("1.2M" is 1200000.0) and percentages
+            are kept in percent.
+        unit: "%" or the unit following the number, empty if there is none.
+        direction: Whether higher or lower values are better for the metric.
+        uncertainty: The "± 0.3" part of the value, if present.
+        others: Additional numbers, e.g. 47.2 for "45.6 / 47.2".
+    """
+
+    raw: Any
+    value: Optional[float] = None
+    unit: str = ""
+    direction: Direction = Direction.higher
+    uncertainty: Optional[float] = None
+    others: Tuple[float, ...] = ()
+
+    @property
+    def higher_is_better(self) -> bool:
+        return self.direction == Direction.higher
+
+
+@functools.lru_cache(maxsize=None)
+def metric_direction(metric: str) -> Direction:
+    """Guess the direction of a metric from its name."""
+    name = " ".join(_NAME_NOISE.sub(" ", metric).casefold().split())
+    if name in LOWER_IS_BETTER_NAMES or LOWER_IS_BETTER.search(name):
+        return Direction.lower
+    return Direction.higher
+
+
+def _number(match) -> float:
+    text = match.group("number").replace("\u2212", "-").replace(",", "")
+    number = float(text)
+    scale = match.groupdict().get("scale")
+    return number * SCALES[scale.lower()] if scale else number
+
+
+def parse_value(raw: Any) -> ParsedValue:
+    """Parse a raw metric value.
+
+    Returns:
+        The value, unit, uncertainty and the other numbers, with the value
+        None if the raw value is not a number.
+    """
+    if isinstance(raw, bool) or raw is None:
+        return None, "", None, ()
+    if isinstance(raw, (int, float)):
+        return float(raw), "", None, ()
+
+    text = str(raw).strip().strip("\ufeff*_~")
+    if text.startswith("(") and text.endswith(")"):
+        # all the numbers in parentheses, e.g. "(32.76 32.07 26.26)"
+        text = text[1:-1]
+    match = QUANTITY.match(text)
+    if match is None:
+        return None, "", None, ()
+    value, unit = _number(match), match.group("unit") or ""
+    position = match.end()
+
+    uncertainty = None
+    match = UNCERTAINTY.match(text, position)
+    if match is not None:
+        uncertainty = _number(match)
+        position = match.end()
+
+    others = []
+    while True:
+        position = _skip_marks(text, position)
+        separator = SEPARATOR.match(text, position)
+        match = separator and QUANTITY.match(text, separator.end())
+        if not match:
+            break
+        others.append(_number(match))
+        position = match.end()
+
+    # only a remark in parentheses can follow the numbers, anything else
+    # means the value was not understood
+    if not REMARK.fullmatch(text, position):
+        return None, "", None, ()
+    return value, unit, uncertainty, tuple(others)
+
+
+def _skip_marks(text: str, position: int) -> int:
+    while position < len(text) and text[position] in MARKS:
+        position += 1
+    return position
+
+
+def normalize(metric: str, raw: Any) -> MetricValue:
+    """Normalize a metric value.
+
+    Scraped tables repeat the same values a lot, so the results are cached,
+    except for lists and objects, which are valid JSON values but can not be
+    cached.
+
+    Args:
+        metric: Metric name.
+        raw: Metric value, as it was scraped.
+    """
+    if isinstance(raw, (list, dict)):
+        return _normalize(metric, raw)
+    return _normalize_cached(metric, raw)
+
+
+def _normalize(metric: str, raw: Any) -> MetricValue:
+    value, unit, uncertainty, others = parse_value(raw)
+    return MetricValue(
+        raw=raw,
+        value=value,
+        unit=unit,
+        direction=metric_direction(metric),
+        uncertainty=uncertainty,
+        others=others,
+    )
+
+
+@functools.lru_cache(maxsize=2 ** 16, typed=True)
+def _normalize_cached(metric: str, raw: Any) -> MetricValue:
+    return _normalize(metric, raw)
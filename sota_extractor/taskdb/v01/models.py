@@ -1,13 +1,18 @@
 from typing import List, Optional, Dict
 from dataclasses import dataclass, field
 
+from sota_extractor.taskdb.v01.metrics import MetricValue, normalize
+from sota_extractor.taskdb.v01.slots import slotted
 
+
+@slotted
 @dataclass
 class Link:
     title: str = ""
     url: str = ""
 
 
+@slotted
 @dataclass
 class SotaRow:
     model_name: str
@@ -18,14 +23,35 @@ class SotaRow:
     model_links: List[Link] = field(default_factory=list)
     metrics: Dict[str, str] = field(default_factory=dict)
     uses_additional_data: bool = False
+    # normalized `metrics`, the raw values are kept for the exports
+    metric_values: Dict[str, MetricValue] = field(
+        default=None, compare=False, repr=False
+    )
+
+    def __post_init__(self):
+        if self.metric_values is None:
+            self.normalize_metrics()
+
+    def normalize_metrics(self):
+        """Normalize the raw `metrics` into `metric_values`.
+
+        It is done when the row is created, call it again after changing the
+        metrics of an existing row.
+        """
+        self.metric_values = {
+            name: normalize(name, value)
+            for name, value in self.metrics.items()
+        }
 
 
+@slotted
 @dataclass
 class Sota:
     metrics: List[str] = field(default_factory=list)
     rows: List[SotaRow] = field(default_factory=list)
 
 
+@slotted
 @dataclass
 class Dataset:
     name: str
@@ -38,6 +64,7 @@ class Dataset:
     citations: List[Link] = field(default_factory=list)
 
 
+@slotted
 @dataclass
 class Task:
     name: str
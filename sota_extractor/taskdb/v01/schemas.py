@@ -1,4 +1,3 @@
-from copy import deepcopy
 from marshmallow import Schema, fields, pre_load, post_load, post_dump
 from sota_extractor.taskdb.v01.models import Link, SotaRow, Sota, Dataset, Task
 
@@ -20,7 +19,7 @@ class SotaRowSchema(Schema):
     code_links = fields.Nested(LinkSchema, many=True, missing=list)
     model_links = fields.Nested(LinkSchema, many=True, missing=list)
     metrics = fields.Dict(keys=fields.String(), values=fields.Inferred())
-    uses_additional_data = fields.Boolean(required=True)
+    uses_additional_data = fields.Boolean(missing=False)
 
     @post_load
     def post_load(self, data, **kwargs):
@@ -51,15 +50,15 @@ class DatasetSchema(Schema):
 
     @pre_load
     def pre_load(self, data, **kwargs):
-        data = deepcopy(data)
+        # Only the top level keys are renamed, so a shallow copy is enough to
+        # leave the input untouched.
+        data = dict(data)
         if "dataset" in data:
-            data["name"] = data["dataset"]
+            data["name"] = data.pop("dataset")
             data["is_subdataset"] = False
-            del data["dataset"]
         elif "subdataset" in data:
-            data["name"] = data["subdataset"]
+            data["name"] = data.pop("subdataset")
             data["is_subdataset"] = True
-            del data["subdataset"]
         else:
             data["name"] = ""
             data["is_subdataset"] = False
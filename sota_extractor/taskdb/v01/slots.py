@@ -0,0 +1,19 @@
+from dataclasses import fields
+
+
+def slotted(cls):
+    """Recreate a dataclass with `__slots__` instead of an instance dict.
+
+    There can be millions of rows and links in a merged TaskDB, and slotted
+    instances are smaller.
+    """
+    names = tuple(f.name for f in fields(cls))
+    namespace = {
+        key: value
+        for key, value in cls.__dict__.items()
+        # defaults are kept by the generated __init__, as class attributes
+        # they would clash with the slots
+        if key not in names and key not in ("__dict__", "__weakref__")
+    }
+    namespace["__slots__"] = names
+    return type(cls)(cls.__name__, cls.__bases__, namespace)
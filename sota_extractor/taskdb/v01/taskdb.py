@@ -3,8 +3,9 @@ import csv
 from typing import Dict, List, Optional, Any
 
 from sota_extractor.consts import Format
-from sota_extractor.errors import ArgumentError
+from sota_extractor.errors import ArgumentError, DataError
 from sota_extractor.taskdb.v01.models import Task, Dataset
+from sota_extractor.taskdb.v01.loader import TaskLoader
 from sota_extractor.taskdb.v01.schemas import TaskSchema
 
 
@@ -12,29 +13,117 @@ class TaskDB:
     def __init__(self):
         self.tasks: Dict[str, Task] = {}
         self.schema = TaskSchema()
+        # Indexes of the tasks and sub-tasks at all depths by name, synonym
+        # and case-folded name or synonym.
+        self._names: Dict[str, List[Task]] = {}
+        self._synonyms: Dict[str, List[Task]] = {}
+        self._folded: Dict[str, List[Task]] = {}
+        # Strings shared by the loaded tasks, see `TaskLoader`.
+        self._strings: Dict[str, str] = {}
 
     def get_task(self, name: str) -> Optional[Task]:
-        """Get a task or a sub-task by name."""
+        """Get a task or a sub-task by name.
+
+        Top-level tasks take precedence, then tasks at any depth with the
+        exact name, then with the exact synonym and finally the tasks whose
+        name or synonym matches case-insensitively.
+        """
         if name in self.tasks:
             return self.tasks[name]
-        else:
-            for task in self.tasks.values():
-                for subtask in task.subtasks:
-                    if subtask.name == name:
-                        return subtask
+        for index, key in (
+            (self._names, name),
+            (self._synonyms, name),
+            (self._folded, name.casefold()),
+        ):
+            tasks = index.get(key)
+            if tasks:
+                return tasks[0]
         return None
 
     def add_task(self, task: Task):
         """Add a top-level task by name."""
+        if task.name in self.tasks:
+            self._unindex(self.tasks[task.name])
         self.tasks[task.name] = task
+        self._index(task)
 
-    def load_tasks(self, files: List[str] = None, data: List[Dict] = None):
+    def remove_task(self, name: str) -> Optional[Task]:
+        """Remove a task or a sub-task, with all its sub-tasks, by name.
+
+        Returns:
+            The removed task or None if there is no task with this name.
+        """
+        if name in self.tasks:
+            task = self.tasks.pop(name)
+        else:
+            tasks = self._names.get(name)
+            if not tasks:
+                return None
+            task = tasks[0]
+            if task.parent is not None:
+                task.parent.subtasks = [
+                    subtask
+                    for subtask in task.parent.subtasks
+                    if subtask is not task
+                ]
+        self._unindex(task)
+        return task
+
+    def add_synonym(self, task: Task, synonym: str):
+        """Add a synonym to a task and index it."""
+        task.synonyms.append(synonym)
+        _add(self._synonyms, synonym, task)
+        _add(self._folded, synonym.casefold(), task)
+
+    def reindex(self):
+        """Rebuild the name indexes.
+
+        Needed only after the tasks were modified in place, e.g. sub-tasks
+        added to a task that is already in the TaskDB.
+        """
+        self._names.clear()
+        self._synonyms.clear()
+        self._folded.clear()
+        for task in self.tasks.values():
+            self._index(task)
+
+    def _index(self, task: Task):
+        _add(self._names, task.name, task)
+        _add(self._folded, task.name.casefold(), task)
+        for synonym in task.synonyms:
+            _add(self._synonyms, synonym, task)
+            _add(self._folded, synonym.casefold(), task)
+        for subtask in task.subtasks:
+            self._index(subtask)
+
+    def _unindex(self, task: Task):
+        _remove(self._names, task.name, task)
+        _remove(self._folded, task.name.casefold(), task)
+        for synonym in task.synonyms:
+            _remove(self._synonyms, synonym, task)
+            _remove(self._folded, synonym.casefold(), task)
+        for subtask in task.subtasks:
+            self._unindex(subtask)
+
+    def load_tasks(
+        self,
+        files: List[str] = None,
+        data: List[Dict] = None,
+        validate: bool = False,
+    ):
         """Load tasks from files or from data.
 
+        By default the tasks are built straight from the data, with the same
+        defaults as the schema, but without validating it. Use `validate` to
+        load data of unknown quality and get detailed validation errors.
+
         Args:
             files (List[str] | str): Path to a document or a list of paths to
-                documents.
-            data: Sota data - list of dictionaries representing tasks.
+                documents, in any format, see `serialization.detect_format`.
+            data: Sota data - list of dictionaries representing tasks, or
+                `Task` instances, e.g. loaded from a snapshot, which are added
+                as they are.
+            validate (bool): Validate the data using the marshmallow schema.
         """
         from sota_extractor.serialization import load
 
@@ -49,9 +138,22 @@ class TaskDB:
             for file in files:
                 data.extend(load(file))
 
-        task_list = self.schema.load(data, many=True)
-        for task in task_list:
-            self.add_task(task)
+        loaded = [item for item in data if not isinstance(item, Task)]
+        if validate:
+            loaded = self.schema.load(loaded, many=True)
+        else:
+            try:
+                loader = TaskLoader(self._strings)
+                loaded = [loader.load_task(task) for task in loaded]
+            except (KeyError, TypeError, AttributeError, ValueError) as e:
+                raise DataError(
+                    f"Invalid task data ({e!r}), load it with validate=True "
+                    f"for details."
+                )
+        # keep the order of the tasks, loaded ones mixed with the instances
+        tasks = iter(loaded)
+        for item in data:
+            self.add_task(item if isinstance(item, Task) else next(tasks))
 
     def load_synonyms(self, csv_files: List[str]):
         """Load task synonyms from input files."""
@@ -60,10 +162,13 @@ class TaskDB:
         for csv_file in csv_files:
             with io.open(csv_file, newline="") as f:
                 reader = csv.reader(f)
-                for row in reader:
+                for i, row in enumerate(reader):
+                    if i == 0 and row == ["task", "synonym"]:
+                        # skip the header
+                        continue
                     task = self.get_task(row[0])
                     if task is not None:
-                        task.synonyms.append(row[1])
+                        self.add_synonym(task, row[1])
 
     def tasks_with_sota(self) -> List[Task]:
         """Extract all tasks with SOTA tables.
@@ -90,11 +195,28 @@ class TaskDB:
         """Export the whole of TaskDB into a list of tasks in Dict format."""
         return self.schema.dump(self.tasks.values(), many=True)
 
-    def export_to_file(self, filename: str, fmt=Format.json):
-        """Export the whole of TaskDB into a file."""
+    def export_to_file(self, filename: str, fmt: Optional[Format] = None):
+        """Export the whole of TaskDB into a file.
+
+        By default the format is chosen by the extension of the file.
+        """
         from sota_extractor.serialization import dump
 
-        dump(self, filename=filename, fmt=fmt)
+        dump(self, output=filename, fmt=fmt)
+
+
+def _add(index: Dict[str, List[Task]], key: str, task: Task):
+    tasks = index.setdefault(key, [])
+    if not any(t is task for t in tasks):
+        tasks.append(task)
+
+
+def _remove(index: Dict[str, List[Task]], key: str, task: Task):
+    tasks = [t for t in index.get(key, ()) if t is not task]
+    if tasks:
+        index[key] = tasks
+    else:
+        index.pop(key, None)
 
 
 def find_sota_tasks(task: Task, out: List):
@@ -0,0 +1,69 @@
+import datetime
+
+import pytest
+
+from sota_extractor.taskdb.v01 import Sota, SotaRow
+from sota_extractor.taskdb.v01.columnar import ColumnarSota
+
+
+def row(name, date, **metrics):
+    return SotaRow(
+        model_name=name,
+        paper_date=None if date is None else datetime.date(*date),
+        metrics=metrics,
+    )
+
+
+@pytest.fixture
+def sota():
+    return Sota(
+        metrics=["Accuracy", "Error"],
+        rows=[
+            row("A", (2018, 1, 1), Accuracy="80.1", Error="3.2%"),
+            row("B", (2017, 5, 1), Accuracy="81%", Error="-"),
+            row("C", (2019, 2, 1), Accuracy="79.5*", Error="2.9"),
+            row("D", None, Accuracy="85.0", Error="1.0"),
+            row("E", (2019, 6, 1), Accuracy="n/a", Error="2.9"),
+            row("F", (2020, 1, 1), Accuracy="82.3"),
+        ],
+    )
+
+
+def test_columnar_sota(sota):
+    columnar = ColumnarSota.from_sota(sota)
+
+    assert len(columnar) == 6
+    assert columnar.masks["Accuracy"].tolist() == [
+        False,
+        False,
+        False,
+        False,
+        True,
+        False,
+    ]
+    assert columnar.column("Error").sum() == pytest.approx(10.0)
+    # lower error rates are better
+    assert columnar.best_per_metric() == {"Accuracy": 3, "Error": 3}
+    assert columnar.best("Error", higher_is_better=True) == 0
+    assert columnar.rank("Accuracy").tolist() == [3, 5, 1, 0, 2]
+    assert columnar.rank("Error").tolist() == [
+        3,
+        2,
+        4,
+        0,
+    ]
+    assert columnar.time_series("Accuracy").tolist() == [1, 5]
+    assert columnar.time_series("Error").tolist() == [0, 2]
+    assert columnar.model_names[columnar.rank("Accuracy")[:2]].tolist() == [
+        "D",
+        "F",
+    ]
+    assert columnar.to_sota() == sota
+
+
+def test_columnar_sota_empty():
+    columnar = ColumnarSota.from_sota(Sota(metrics=["Accuracy"]))
+
+    assert columnar.best("Accuracy") is None
+    assert columnar.rank("Accuracy").tolist() == []
+    assert columnar.time_series("Accuracy").tolist() == []
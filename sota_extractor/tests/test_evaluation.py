@@ -0,0 +1,188 @@
+import os
+import sys
+import random
+
+from sota_extractor.evaluation import CorpusCache, PhraseIndex
+from sota_extractor.commands.evaluate import (
+    add_features,
+    eval_rows,
+    eval_task,
+    peak_rss,
+    report,
+)
+from sota_extractor.evaluation.matchers import MATCHERS, get_matcher
+from sota_extractor.taskdb.v01 import Task, Dataset, Sota, SotaRow
+
+
+def test_phrase_index_matches_substring_search():
+    rng = random.Random(0)
+    words = ["parsing", "dependency", "pars", "ing", "semantic", "role"]
+    separators = [" ", "-", " (", ") ", ", "]
+
+    def text(n):
+        return "".join(
+            rng.choice(words) + rng.choice(separators) for _ in range(n)
+        )
+
+    docs = [text(rng.randint(0, 8)) for _ in range(300)]
+    phrases = [
+        "parsing",
+        "dependency parsing",
+        "ing dep",
+        "semantic-role",
+        "rsing, sem",
+        "(role)",
+        "-",
+        "",
+        "unrelated",
+    ]
+
+    index = PhraseIndex(phrases)
+    for doc in docs:
+        index.add(doc[: len(doc) // 2], doc[len(doc) // 2 :])
+
+    for phrase in phrases:
+        expected = {
+            i
+            for i, doc in enumerate(docs)
+            if phrase in doc[: len(doc) // 2] or phrase in doc[len(doc) // 2 :]
+        }
+        candidates = index.candidates(phrase)
+        if candidates is None:
+            candidates = set(range(len(docs)))
+        assert expected <= candidates
+
+    assert index.candidates("unrelated") == set()
+
+
+def test_eval_task():
+    predicted = [
+        {"arxiv_id": "1805.10616", "title_lower": "first"},
+        {"arxiv_id": "1806.00001", "title_lower": "second"},
+        {"arxiv_id": "", "title_lower": "third"},
+        {"arxiv_id": "1807.00001", "title_lower": ""},
+    ]
+    rows = [
+        SotaRow("a", paper_url="https://arxiv.org/abs/1805.10616v2"),
+        SotaRow("b", paper_title="Second"),
+        SotaRow("c", paper_title="Third", paper_url="1806.00001.pdf"),
+        SotaRow("d", paper_title="Missing"),
+        SotaRow("e"),
+    ]
+    task = Task(
+        name="Task",
+        datasets=[
+            Dataset(
+                name="Dataset",
+                sota=Sota(rows=rows[:2]),
+                subdatasets=[Dataset(name="Sub", sota=Sota(rows=rows[2:]))],
+            )
+        ],
+    )
+
+    tp, fn, fp = eval_task(predicted, task)
+    assert tp == [predicted[0], predicted[1], predicted[1], predicted[2]]
+    assert fn == rows[3:]
+    assert fp == [predicted[3]]
+
+
+def test_eval_rows():
+    arxiv = [
+        {
+            "arxiv_id": f"1805.{i:05d}",
+            "title_lower": f"paper {i} on task {i % 5}",
+            "abstract_lower": "we achieve state-of-the-art results",
+            "contains_sota": True,
+        }
+        for i in range(50)
+    ]
+    tasks = [
+        Task(
+            name=f"Task {i}",
+            datasets=[
+                Dataset(
+                    name="Dataset",
+                    sota=Sota(
+                        rows=[
+                            SotaRow("m", paper_url=f"/abs/1805.{j:05d}")
+                            for j in range(i, 50, 7)
+                        ]
+                    ),
+                )
+            ],
+        )
+        for i in range(5)
+    ]
+    rows = eval_rows(tasks, arxiv, get_matcher("substring"))
+    assert [row["task"] for row in rows] == [task.name for task in tasks]
+
+    for name in MATCHERS:
+        matcher = get_matcher(name)
+        matcher.prepare(arxiv, tasks)
+        assert eval_rows(tasks, arxiv, matcher) == rows
+        assert eval_rows(tasks, arxiv, matcher, jobs=3) == rows
+
+
+def test_report():
+    rows = [
+        {
+            "task": "A",
+            "parent": "P",
+            "tp": 0,
+            "fn": 23,
+            "fp": 3,
+            "precision": 0.0,
+            "recall": 0,
+        },
+        {
+            "task": "B",
+            "parent": "",
+            "tp": 3,
+            "fn": 3,
+            "fp": 0,
+            "precision": 0,
+            "recall": 0.5,
+        },
+    ]
+    assert report(rows).to_csv() == (
+        ",task,parent,tp,fn,fp,precision,recall\n"
+        "0,A,P,0,23,3,0.0,0\n"
+        "1,B,,3,3,0,0.0,0.5\n"
+        "2,,Total,1.5,13.0,1.5,0.0,0.25\n"
+    )
+
+
+def test_corpus_cache(tmp_path):
+    source = tmp_path / "corpus.json"
+    source.write_text("[]")
+    papers = [{"title": "A", "abstract": "a"}, {"title": "B", "extra": None}]
+
+    cache = CorpusCache(str(tmp_path / "cache"))
+    assert cache.get(str(source)) is None
+    cache.put(str(source), papers)
+    assert cache.get(str(source)) == papers
+
+    # touching the file keeps the cache, changing it invalidates it
+    os.utime(str(source), ns=(0, 0))
+    assert cache.get(str(source)) == papers
+    source.write_text("[{}]")
+    assert cache.get(str(source)) is None
+
+
+def test_add_features():
+    papers = [{"title": "A Title", "abstract": "New SOTA results."}]
+
+    assert add_features(papers, ["contains_sota"]) == [
+        "abstract_lower",
+        "contains_sota",
+    ]
+    assert papers[0]["contains_sota"] is True
+    assert "title_stem" not in papers[0]
+    assert add_features(papers, ["abstract_lower"]) == []
+
+
+def test_peak_rss(monkeypatch):
+    assert peak_rss() > 0
+    # the resource module is not available on Windows
+    monkeypatch.setitem(sys.modules, "resource", None)
+    assert peak_rss() is None
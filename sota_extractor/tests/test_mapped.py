@@ -0,0 +1,100 @@
+import pytest
+
+from sota_extractor import serialization
+from sota_extractor.consts import Format
+from sota_extractor.errors import DataError
+from sota_extractor.taskdb.v01 import MappedTaskDB, TaskDB
+from sota_extractor.taskdb.v01 import mapped
+
+
+@pytest.fixture
+def tdb():
+    tdb = TaskDB()
+    tdb.load_tasks(["data/tasks/eff.json", "data/tasks/nlp-progress.json"])
+    tdb.add_synonym(tdb.get_task("Dialogue State Tracking"), "DST")
+    # loaded again, so the index order is the order of the tasks
+    loaded = TaskDB()
+    loaded.load_tasks(data=tdb.export())
+    return loaded
+
+
+@pytest.fixture
+def filename(tmp_path, tdb):
+    filename = str(tmp_path / "tasks.mapped")
+    serialization.dump(tdb, filename, fmt=Format.mapped)
+    return filename
+
+
+def names(task, out):
+    out.extend([task.name, task.name.upper(), *task.synonyms])
+    for subtask in task.subtasks:
+        names(subtask, out)
+    return out
+
+
+def test_mapped_taskdb(tdb, filename):
+    with MappedTaskDB(filename) as mtdb:
+        assert list(mtdb.tasks) == list(tdb.tasks)
+        assert mtdb.export() == tdb.export()
+        assert [t.name for t in mtdb.tasks_with_sota()] == [
+            t.name for t in tdb.tasks_with_sota()
+        ]
+        assert [d.name for d in mtdb.datasets_with_sota()] == [
+            d.name for d in tdb.datasets_with_sota()
+        ]
+        for task in tdb.tasks.values():
+            for name in names(task, []):
+                assert tdb.schema.dump(mtdb.get_task(name)) == (
+                    tdb.schema.dump(tdb.get_task(name))
+                )
+        assert mtdb.get_task("Unknown") is None
+
+
+def test_mapped_taskdb_lazy(tdb, filename):
+    mtdb = MappedTaskDB(filename)
+    assert mtdb._tasks == {}
+
+    task = mtdb.get_task("dst")
+    assert task.name == "Dialogue State Tracking"
+    assert mtdb.get_task("Dialogue") is task.parent
+    assert mtdb.get_task("Dialogue State Tracking") is task
+    # only the task tree of the found task is built
+    assert len(mtdb._tasks) == 1 + len(task.parent.subtasks)
+
+    rows = task.datasets[0].sota.rows
+    assert isinstance(rows, mapped.MappedRows)
+    expected = tdb.get_task("Dialogue State Tracking").datasets[0].sota.rows
+    assert len(rows) == len(expected)
+    assert rows == expected
+    assert rows[-1] == expected[-1] and rows[1:3] == expected[1:3]
+
+    mtdb.close()
+    assert task.parent.name == "Dialogue"
+
+
+def test_mapped_taskdb_empty(tmp_path):
+    filename = str(tmp_path / "tasks.mapped")
+    serialization.dump(TaskDB(), filename, fmt=Format.mapped)
+
+    mtdb = MappedTaskDB(filename)
+    assert mtdb.export() == []
+    assert mtdb.get_task("Task") is None
+    assert serialization.load(filename, fmt=Format.mapped) == []
+
+
+def test_mapped_taskdb_invalid(tmp_path, filename, monkeypatch):
+    with pytest.raises(DataError):
+        MappedTaskDB("data/tasks/squad.json")
+    empty = tmp_path / "empty.mapped"
+    empty.write_bytes(b"")
+    with pytest.raises(DataError):
+        MappedTaskDB(str(empty))
+    monkeypatch.setattr(mapped, "MAPPED_VERSION", 2)
+    with pytest.raises(DataError):
+        MappedTaskDB(filename)
+
+
+def test_load_mapped(tdb, filename):
+    loaded = TaskDB()
+    loaded.load_tasks(data=serialization.load(filename, fmt=Format.mapped))
+    assert loaded.export() == tdb.export()
@@ -0,0 +1,131 @@
+import pytest
+
+from sota_extractor.taskdb.v01 import SotaRow
+from sota_extractor.taskdb.v01.metrics import (
+    Direction,
+    MetricValue,
+    metric_direction,
+    normalize,
+    parse_value,
+)
+
+
+@pytest.mark.parametrize(
+    "raw, expected",
+    [
+        ("93.2", (93.2, "", None, ())),
+        ("86.1%", (86.1, "%", None, ())),
+        ("1.2M", (1.2e6, "", None, ())),
+        ("1.6m", (1.6e6, "", None, ())),
+        ("0.46B", (0.46e9, "", None, ())),
+        ("3 ms", (3.0, "ms", None, ())),
+        ("**70.3**", (70.3, "", None, ())),
+        ("92.1*", (92.1, "", None, ())),
+        ("43B?", (43e9, "", None, ())),
+        ("~257M", (257e6, "", None, ())),
+        ("﻿93.3", (93.3, "", None, ())),
+        ("−1.5", (-1.5, "", None, ())),
+        ("90.0 ± 0.3", (90.0, "", 0.3, ())),
+        ("0.25±0.005", (0.25, "", 0.005, ())),
+        ("92.1 +- 0.3", (92.1, "", 0.3, ())),
+        ("45.6 / 47.2", (45.6, "", None, (47.2,))),
+        ("90.1/89.7*", (90.1, "", None, (89.7,))),
+        ("(32.76 32.07 26.26)", (32.76, "", None, (32.07, 26.26))),
+        ("70.14 (measured by Ge et al., 2018)", (70.14, "", None, ())),
+        ("1,234", (1234.0, "", None, ())),
+        ("10,000 words", (10000.0, "words", None, ())),
+        ("1,234.5 / 2,000", (1234.5, "", None, (2000.0,))),
+        ("45.6, 47.2", (45.6, "", None, (47.2,))),
+        ("1e-3", (0.001, "", None, ())),
+        ("1.2e5", (1.2e5, "", None, ())),
+        ("2.5E+2M", (2.5e8, "", None, ())),
+        ("3 m", (3.0, "m", None, ())),
+        ("3m", (3e6, "", None, ())),
+        (3, (3.0, "", None, ())),
+        (2.5, (2.5, "", None, ())),
+    ],
+)
+def test_parse_value(raw, expected):
+    assert parse_value(raw) == expected
+
+
+@pytest.mark.parametrize(
+    "raw",
+    [
+        "-",
+        "",
+        "--*",
+        "Yes",
+        "n/a",
+        None,
+        True,
+        "1,23",
+        "1,2345",
+        "12,34,567",
+        "1.5.2",
+        "86.1% of 90",
+    ],
+)
+def test_parse_value_invalid(raw):
+    assert parse_value(raw) == (None, "", None, ())
+
+
+@pytest.mark.parametrize(
+    "metric, direction",
+    [
+        ("Accuracy", Direction.higher),
+        ("F1 score", Direction.higher),
+        ("Test perplexity", Direction.lower),
+        ("Top-1 Error", Direction.lower),
+        ("WER", Direction.lower),
+        ("Bit per Character (BPC)", Direction.lower),
+        ("Bits per dim", Direction.lower),
+        ("Number of params", Direction.lower),
+        ("Inference time (ms)", Direction.lower),
+        ("Word Error Rate (%)", Direction.lower),
+        ("VI", Direction.lower),
+        ("Test Loss", Direction.lower),
+        ("Time-aware F1", Direction.higher),
+        ("Bits per dim accuracy", Direction.higher),
+        ("Parameters matched", Direction.higher),
+        ("Error analysis F1", Direction.higher),
+        ("VI accuracy", Direction.higher),
+        ("Temporal awareness", Direction.higher),
+    ],
+)
+def test_metric_direction(metric, direction):
+    assert metric_direction(metric) == direction
+
+
+def test_normalize():
+    value = normalize("Test Error", "2.53 ± 0.40")
+
+    assert value == MetricValue(
+        raw="2.53 ± 0.40",
+        value=2.53,
+        direction=Direction.lower,
+        uncertainty=0.4,
+    )
+    assert not value.higher_is_better
+    # repeated values are parsed once
+    assert normalize("Test Error", "2.53 ± 0.40") is value
+    # and values of different types are not mixed up
+    assert normalize("Test Error", 1).raw == 1
+    assert normalize("Test Error", True).value is None
+    # lists and objects are not cached, nor parsed
+    for raw in [[1, 2], {"a": 1}]:
+        assert normalize("Test Error", raw) == MetricValue(
+            raw=raw, direction=Direction.lower
+        )
+
+
+def test_sota_row_metric_values():
+    row = SotaRow(model_name="Model", metrics={"EM": "80.1*", "F1": 88})
+
+    assert {name: v.value for name, v in row.metric_values.items()} == {
+        "EM": 80.1,
+        "F1": 88.0,
+    }
+    assert row.metrics == {"EM": "80.1*", "F1": 88}
+    row = SotaRow(model_name="Model", metrics={"A": [1, 2]})
+    assert row.metric_values["A"].value is None
@@ -0,0 +1,173 @@
+import os
+import subprocess
+
+import pytest
+
+from sota_extractor import serialization
+from sota_extractor.scrapers.nlp_progress import main
+from sota_extractor.scrapers.nlp_progress.markdown import (
+    parse_file,
+    parse_text,
+)
+
+SENTIMENT = """# Sentiment analysis
+
+Sentiment analysis is the task of classifying the polarity of a text.
+
+### IMDb
+
+The [IMDb dataset](https://ai.stanford.edu/~amaas/data/sentiment/) contains
+movie reviews.
+
+| Model           | Accuracy | Paper / Source | Code |
+| ------------- | :-----:| --- | --- |
+| XLNet (Yang et al., 2019) | 96.21 | [XLNet](https://arxiv.org/pdf/1906.08237.pdf) | [Official](https://github.com/zihangdai/xlnet/) |
+| BERT_large+ITPT (Sun et al., 2019) | 95.79 | [How to Fine-Tune BERT](https://arxiv.org/pdf/1905.05583.pdf) | |
+
+## Subjectivity
+
+### SUBJ
+
+| Model           | Accuracy | Paper / Source |
+| ------------- | :-----:| --- |
+| AdaSent (Zhao et al., 2015) | 95.5 | [Self-Adaptive Hierarchical Sentence Model](https://arxiv.org/pdf/1504.05070.pdf) |
+"""  # noqa: E501
+
+PARSING = """# Constituency parsing
+
+Constituency parsing aims to extract a parse tree from a sentence.
+
+### Penn Treebank
+
+| Model           | F1 score  | Paper / Source |
+| ------------- | :-----:| --- |
+| Self-attentive encoder (Kitaev and Klein, 2018) | {score} | [Constituency Parsing with a Self-Attentive Encoder](https://arxiv.org/abs/1805.01052) |
+"""  # noqa: E501
+
+
+def test_parse_text(tmp_path):
+    path = tmp_path / "sentiment_analysis.md"
+    path.write_text(SENTIMENT)
+    expected = parse_file(str(path)).export()
+
+    assert [t["task"] for t in expected] == ["Sentiment Analysis"]
+    # the parser is reused, nothing is carried over between documents
+    assert parse_text(PARSING.format(score="95.13")).export() != expected
+    assert parse_text(SENTIMENT).export() == expected
+    assert parse_text("\ufeff" + SENTIMENT).export() == expected
+    assert parse_text("  \n").export() == []
+
+
+def git(*args):
+    subprocess.run(
+        ["git", "-c", "user.name=test", "-c", "user.email=test@test", *args],
+        check=True,
+        capture_output=True,
+    )
+
+
+def commit(repo, files):
+    for filename, text in files.items():
+        path = os.path.join(repo, "english", filename)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+    git("-C", repo, "add", "-A")
+    git("-C", repo, "commit", "-q", "-m", "Update")
+
+
+@pytest.fixture
+def repo(tmp_path):
+    path = str(tmp_path / "repo")
+    git("init", "-q", path)
+    commit(
+        path,
+        {
+            "sentiment_analysis.md": SENTIMENT,
+            "constituency_parsing.md": PARSING.format(score="95.13"),
+        },
+    )
+    return path
+
+
+@pytest.fixture
+def parsed(monkeypatch):
+    """Record the files that are parsed."""
+    filenames = []
+
+    def record(filename):
+        filenames.append(os.path.basename(filename))
+        return parse_file(filename)
+
+    monkeypatch.setattr(main, "parse_file", record)
+    return filenames
+
+
+def expected(repo):
+    filenames = sorted(os.listdir(os.path.join(repo, "english")))
+    tasks = []
+    for filename in filenames:
+        tdb = parse_file(os.path.join(repo, "english", filename))
+        tasks.extend(tdb.export())
+    return tasks
+
+
+def test_nlp_progress_incremental(tmp_path, repo, parsed):
+    cache_dir = str(tmp_path / "cache")
+
+    tdb = main.nlp_progress(repo=repo, cache_dir=cache_dir)
+    assert tdb.export() == expected(repo)
+    assert parsed == ["constituency_parsing.md", "sentiment_analysis.md"]
+
+    # nothing changed
+    del parsed[:]
+    tdb = main.nlp_progress(repo=repo, cache_dir=cache_dir)
+    assert parsed == []
+    assert serialization.dumps(tdb) == serialization.dumps(
+        main.nlp_progress(repo=repo)
+    )
+
+    # only the changed file is parsed again
+    commit(repo, {"constituency_parsing.md": PARSING.format(score="95.5")})
+    del parsed[:]
+    tdb = main.nlp_progress(repo=repo, cache_dir=cache_dir)
+    assert parsed == ["constituency_parsing.md"]
+    assert tdb.export() == expected(repo)
+    fragments = os.listdir(
+        os.path.join(
+            cache_dir, f"nlp-progress-fragments-v{main.FRAGMENTS_VERSION}"
+        )
+    )
+    assert len(fragments) == 2
+
+
+def test_nlp_progress_bare_repo(tmp_path, repo):
+    bare = str(tmp_path / "bare.git")
+    git("clone", "-q", "--bare", repo, bare)
+
+    tdb = main.nlp_progress(repo=bare, cache_dir=str(tmp_path / "cache"))
+    assert tdb.export() == expected(repo)
+
+
+def test_nlp_progress_jobs(tmp_path, repo):
+    commit(
+        repo,
+        {
+            f"task_{i}.md": PARSING.format(score=90 + i).replace(
+                "Constituency", f"Task {i}"
+            )
+            for i in range(5)
+        },
+    )
+    serial = serialization.dumps(main.nlp_progress(repo=repo))
+    cache_dir = str(tmp_path / "cache")
+
+    assert serialization.dumps(
+        main.nlp_progress(repo=repo, cache_dir=cache_dir, jobs=3)
+    ) == serial
+    # merged with the cached fragments, task_2.md now defines the same task as
+    # constituency_parsing.md and it comes later in the filename order
+    commit(repo, {"task_2.md": PARSING.format(score="96.0")})
+    assert serialization.dumps(
+        main.nlp_progress(repo=repo, cache_dir=cache_dir, jobs=3)
+    ) == serialization.dumps(main.nlp_progress(repo=repo))
@@ -0,0 +1,210 @@
+import os
+import sys
+import json
+import hashlib
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from click.testing import CliRunner
+
+from sota_extractor import scrapers
+from sota_extractor.commands import cli
+from sota_extractor.errors import ArgumentError
+from sota_extractor.scrapers.cache import HttpCache
+from sota_extractor.scrapers.runner import scrape_all
+from sota_extractor.taskdb.v01 import TaskDB
+
+EFF = {
+    "problems": [
+        {
+            "name": "Image classification",
+            "metrics": [
+                {
+                    "name": "CIFAR-10 Image Recognition",
+                    "scale": "Percentage correct",
+                    "measures": [
+                        {
+                            "name": "Model",
+                            "papername": "Paper",
+                            "url": "http://paper",
+                            "value": 95.1,
+                            "replicated_url": "",
+                        }
+                    ],
+                }
+            ],
+        }
+    ]
+}
+
+REDDIT = """### Computer Vision
+#### 1. Image Classification
+<table>
+<tr><td><a href="http://paper">Paper</a></td><td><ul><li>CIFAR-10</li></ul>
+</td><td><ul><li>Accuracy: 95.1</li></ul></td>
+<td><a href="http://code">Code</a></td></tr>
+</table>
+"""
+
+PAGES = {
+    "/eff.json": (200, json.dumps(EFF), 0),
+    "/reddit.md": (200, REDDIT, 0),
+    "/snli": (404, "Not found", 0),
+    "/squad": (200, "<html></html>", 1),
+}
+
+
+#: Paths and response statuses of the requests.
+REQUESTS = []
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        status, body, delay = PAGES.get(self.path, (404, "", 0))
+        time.sleep(delay)
+        data = body.encode("utf-8")
+        etag = f'"{hashlib.sha256(data).hexdigest()}"'
+        if status == 200 and self.headers.get("If-None-Match") == etag:
+            status, data = 304, b""
+        REQUESTS.append((self.path, status))
+        self.send_response(status)
+        if status in (200, 304):
+            self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server(monkeypatch):
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    httpd.daemon_threads = True
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{httpd.server_address[1]}"
+    for name, path in [
+        ("eff", "/eff.json"),
+        ("reddit", "/reddit.md"),
+        ("snli", "/snli"),
+        ("squad", "/squad"),
+    ]:
+        monkeypatch.setattr(getattr(scrapers, name), "url", url + path)
+    del REQUESTS[:]
+    yield url
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_scrape_all(server, tmp_path):
+    completed = []
+    results = scrape_all(
+        output_dir=str(tmp_path),
+        sources=["eff", "reddit", "snli", "squad"],
+        timeouts={"squad": 0.2},
+        callback=completed.append,
+    )
+
+    assert completed == results
+    results = {result.name: result for result in results}
+    assert sorted(results) == ["eff", "reddit", "snli", "squad"]
+    for name, filename in [("eff", "eff.json"), ("reddit", "redditsota.json")]:
+        assert results[name].ok
+        assert results[name].output == str(tmp_path / filename)
+        tdb = TaskDB()
+        tdb.load_tasks(results[name].output)
+        assert len(tdb.tasks) == 1
+
+    assert not results["snli"].ok
+    assert not results["squad"].ok
+    assert "timed out" in results["squad"].error
+    assert results["squad"].seconds < 1
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "eff.json",
+        "redditsota.json",
+    ]
+
+
+def test_scrape_all_unknown_source(tmp_path):
+    with pytest.raises(ArgumentError):
+        scrape_all(output_dir=str(tmp_path), sources=["eff", "unknown"])
+
+
+def test_scrape_all_command(server, tmp_path):
+    runner = CliRunner()
+    args = ["scrape-all", "-d", str(tmp_path), "--no-cache"]
+    result = runner.invoke(cli, [*args, "-s", "eff", "-s", "reddit"])
+    assert result.exit_code == 0
+    assert "Scraped 2 of 2 sources" in result.output
+
+    result = runner.invoke(cli, [*args, "-s", "eff", "-s", "snli"])
+    assert result.exit_code == 1
+    assert "Scraped 1 of 2 sources" in result.output
+
+
+def test_http_cache(server, tmp_path, monkeypatch):
+    eff = sys.modules["sota_extractor.scrapers.eff"]
+    cache = HttpCache(str(tmp_path))
+    expected = eff.eff(cache=cache).export()
+
+    # not modified, the page is not parsed again
+    with monkeypatch.context() as m:
+        m.setattr(eff, "json", None)
+        assert eff.eff(cache=cache).export() == expected
+
+    # modified
+    changed = json.loads(json.dumps(EFF))
+    changed["problems"][0]["metrics"][0]["measures"][0]["value"] = 96.0
+    monkeypatch.setitem(PAGES, "/eff.json", (200, json.dumps(changed), 0))
+    tdb = eff.eff(cache=cache)
+    assert tdb.export() != expected
+    assert eff.eff(cache=cache).export() == tdb.export()
+    assert REQUESTS == [
+        ("/eff.json", 200),
+        ("/eff.json", 304),
+        ("/eff.json", 200),
+        ("/eff.json", 304),
+    ]
+
+
+def test_http_cache_invalid_entry(server, tmp_path):
+    eff = sys.modules["sota_extractor.scrapers.eff"]
+    cache = HttpCache(str(tmp_path))
+    expected = eff.eff(cache=cache).export()
+    with open(cache.path(eff.eff.url)) as fp:
+        entry = json.load(fp)
+    del entry["tasks"]
+    with open(cache.path(eff.eff.url), "w") as fp:
+        json.dump(entry, fp)
+
+    assert eff.eff(cache=cache).export() == expected
+    assert REQUESTS == [
+        ("/eff.json", 200),
+        ("/eff.json", 304),
+        ("/eff.json", 200),
+    ]
+    # the page is cached again
+    assert eff.eff(cache=cache).export() == expected
+    assert REQUESTS[-1] == ("/eff.json", 304)
+
+
+def test_scrape_all_cache_dir(server, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    for _ in range(2):
+        results = scrape_all(
+            output_dir=str(tmp_path / "tasks"),
+            sources=["eff", "reddit"],
+            cache_dir=cache_dir,
+        )
+        assert all(result.ok for result in results)
+    assert sorted(REQUESTS) == [
+        ("/eff.json", 200),
+        ("/eff.json", 304),
+        ("/reddit.md", 200),
+        ("/reddit.md", 304),
+    ]
+    assert len(os.listdir(os.path.join(cache_dir, "http"))) == 2
@@ -0,0 +1,183 @@
+import io
+import os
+import sys
+import gzip
+import json
+
+import pytest
+
+from sota_extractor import serialization
+from sota_extractor.consts import Format
+from sota_extractor.errors import DataError, UnsupportedFormat
+
+
+def test_iter_array_small_chunks():
+    data = [{"a": [1, 2, {"b": "]"}]}, 12345, "x, y", None, [], {}]
+    fp = io.StringIO(json.dumps(data, indent=2))
+    assert list(serialization.iter_array(fp, chunk_size=3)) == data
+
+
+def test_iter_array_empty():
+    assert list(serialization.iter_array(io.StringIO(" [ ] "))) == []
+
+
+@pytest.mark.parametrize("text", ["{}", "[1, 2", "[1 2]", "[1,]"])
+def test_iter_array_invalid(text):
+    with pytest.raises(DataError):
+        list(serialization.iter_array(io.StringIO(text), chunk_size=2))
+
+
+@pytest.mark.parametrize(
+    "fmt", [Format.json, Format.json_gz, Format.jsonl, Format.jsonl_gz]
+)
+def test_iter_load(tmp_path, fmt):
+    tdb = serialization.TaskDB()
+    tdb.load_tasks("data/tasks/snli.json")
+    filename = str(tmp_path / f"snli.{fmt.value}")
+    serialization.dump(tdb, filename, fmt=fmt)
+
+    assert list(serialization.iter_load(filename, fmt=fmt)) == (
+        serialization.load(filename, fmt=fmt)
+    )
+    assert serialization.load(filename, fmt=fmt) == tdb.export()
+
+
+@pytest.mark.parametrize("fmt", [Format.jsonl, Format.jsonl_gz])
+def test_load_range(tmp_path, fmt):
+    tdb = serialization.TaskDB()
+    tdb.load_tasks("data/tasks/nlp-progress.json")
+    filename = str(tmp_path / f"tasks.{fmt.value}")
+    serialization.dump(tdb, filename, fmt=fmt)
+
+    index = serialization.load_index(filename)
+    assert index["format"] == fmt.value
+    entries = index["tasks"][::-1][:3]
+    ranges = [(offset, length) for _, offset, length, _ in entries]
+    assert serialization.load_range(filename, ranges, fmt=fmt) == [
+        tdb.schema.dump(tdb.tasks[name]) for name, _, _, _ in entries
+    ]
+
+
+@pytest.mark.parametrize("fmt", [Format.json, Format.json_gz])
+@pytest.mark.parametrize("filenames", [[], ["data/tasks/squad.json"]])
+def test_dump_streaming(tmp_path, fmt, filenames):
+    tdb = serialization.TaskDB()
+    for filename in filenames:
+        tdb.load_tasks(filename)
+    expected = json.dumps(tdb.export(), indent=2, sort_keys=True)
+    assert "".join(serialization.iter_dumps(tdb)) == expected
+
+    filename = str(tmp_path / f"squad.{fmt.value}")
+    serialization.dump(tdb, filename, fmt=fmt)
+    opener = gzip.open if fmt == Format.json_gz else open
+    with opener(filename, "rb") as fp:
+        assert fp.read() == expected.encode("utf-8")
+
+
+def test_snapshot(tmp_path, monkeypatch):
+    tdb = serialization.TaskDB()
+    tdb.load_tasks("data/tasks/nlp-progress.json")
+    filename = str(tmp_path / "tasks.snapshot")
+    serialization.dump(tdb, filename, fmt=Format.snapshot)
+
+    loaded = serialization.TaskDB()
+    loaded.load_tasks(data=serialization.load(filename, fmt=Format.snapshot))
+    assert loaded.export() == tdb.export()
+    subtask = loaded.get_task("Dialogue State Tracking")
+    assert subtask.parent is loaded.tasks["Dialogue"]
+
+    monkeypatch.setattr(serialization, "SNAPSHOT_VERSION", 2)
+    with pytest.raises(DataError):
+        serialization.load(filename, fmt=Format.snapshot)
+    with pytest.raises(DataError):
+        serialization.load("data/tasks/squad.json", fmt=Format.snapshot)
+
+
+def test_load_tasks_mixed():
+    tdb = serialization.TaskDB()
+    tdb.load_tasks("data/tasks/nlp-progress.json")
+    data = tdb.export()
+    tasks = list(tdb.tasks.values())
+    for validate in [False, True]:
+        mixed = serialization.TaskDB()
+        mixed.load_tasks(
+            data=[tasks[0], *data[1:2], *tasks[2:]], validate=validate
+        )
+        assert mixed.export() == data
+
+
+@pytest.mark.parametrize(
+    "fmt",
+    [
+        f
+        for f in Format
+        if f not in (Format.json_zst, Format.json_lz4, Format.snapshot)
+    ],
+)
+def test_detect_format(tmp_path, fmt):
+    tdb = serialization.TaskDB()
+    tdb.load_tasks("data/tasks/nlp-progress.json")
+    filename = str(tmp_path / f"tasks.{fmt.value}")
+    serialization.dump(tdb, filename)
+
+    assert serialization.detect_format(filename) == fmt
+    loaded = serialization.TaskDB()
+    loaded.load_tasks(filename)
+    assert loaded.export() == tdb.export()
+    if fmt not in (Format.jsonl, Format.jsonl_gz):
+        # the magic bytes take precedence over a wrong extension
+        os.rename(filename, str(tmp_path / "tasks.json"))
+        assert serialization.detect_format(str(tmp_path / "tasks.json")) == (
+            fmt
+        )
+
+
+def test_detect_format_snapshot(tmp_path):
+    tdb = serialization.TaskDB()
+    tdb.load_tasks("data/tasks/squad.json")
+    filename = str(tmp_path / "tasks.json")
+    serialization.dump(tdb, filename, fmt=Format.snapshot)
+
+    # snapshots are pickles, they are loaded only when asked for
+    for load in [serialization.detect_format, serialization.load]:
+        with pytest.raises(DataError):
+            load(filename)
+    with pytest.raises(DataError):
+        serialization.TaskDB().load_tasks(filename)
+    assert len(serialization.load(filename, fmt=Format.snapshot)) == len(
+        tdb.tasks
+    )
+
+
+@pytest.mark.parametrize(
+    "fmt, module",
+    [(Format.json_zst, "zstandard"), (Format.json_lz4, "lz4.frame")],
+)
+def test_compressed(tmp_path, fmt, module):
+    pytest.importorskip(module)
+    tdb = serialization.TaskDB()
+    tdb.load_tasks("data/tasks/squad.json")
+    filename = str(tmp_path / f"tasks.{fmt.value}")
+    serialization.dump(tdb, filename)
+
+    assert serialization.detect_format(filename) == fmt
+    assert serialization.load(filename) == tdb.export()
+    assert list(serialization.iter_load(filename)) == tdb.export()
+
+
+@pytest.mark.parametrize(
+    "fmt, modules",
+    [
+        (Format.json_zst, ["zstandard"]),
+        (Format.json_lz4, ["lz4", "lz4.frame"]),
+    ],
+)
+def test_compressed_missing_module(tmp_path, monkeypatch, fmt, modules):
+    # block the submodules too, they may be imported already
+    for module in modules:
+        monkeypatch.setitem(sys.modules, module, None)
+    with pytest.raises(UnsupportedFormat) as e:
+        serialization.dump(
+            serialization.TaskDB(), str(tmp_path / "tasks"), fmt=fmt
+        )
+    assert f"install the {modules[0]} package" in e.value.message
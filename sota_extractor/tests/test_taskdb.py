@@ -0,0 +1,193 @@
+import copy
+
+import pytest
+
+from sota_extractor import serialization
+from sota_extractor.consts import Format
+from sota_extractor.errors import DataError
+from sota_extractor.taskdb.v01 import LazyTaskDB, Task, TaskDB
+
+
+def test_get_task():
+    deep = Task(name="Deep Task", synonyms=["Deep Synonym"])
+    sub = Task(name="Sub Task", subtasks=[deep])
+    deep.parent = sub
+    top = Task(name="Top Task", subtasks=[sub])
+    sub.parent = top
+
+    tdb = TaskDB()
+    tdb.add_task(top)
+    tdb.add_task(Task(name="Sub Task Top"))
+
+    assert tdb.get_task("Top Task") is top
+    assert tdb.get_task("Sub Task") is sub
+    assert tdb.get_task("Deep Task") is deep
+    assert tdb.get_task("Deep Synonym") is deep
+    assert tdb.get_task("deep synonym") is deep
+    assert tdb.get_task("TOP TASK") is top
+    assert tdb.get_task("Missing") is None
+
+    # replacing a top-level task drops its sub-tasks from the index
+    tdb.add_task(Task(name="Top Task"))
+    assert tdb.get_task("Sub Task") is None
+    assert tdb.get_task("Deep Task") is None
+
+
+def test_remove_task():
+    sub = Task(name="Sub Task")
+    top = Task(name="Top Task", subtasks=[sub])
+    sub.parent = top
+
+    tdb = TaskDB()
+    tdb.add_task(top)
+    tdb.add_synonym(sub, "Synonym")
+    assert tdb.get_task("synonym") is sub
+
+    assert tdb.remove_task("Sub Task") is sub
+    assert top.subtasks == []
+    assert tdb.get_task("Synonym") is None
+
+    assert tdb.remove_task("Top Task") is top
+    assert tdb.tasks == {}
+    assert tdb.get_task("top task") is None
+    assert tdb.remove_task("Top Task") is None
+
+
+def test_load_synonyms():
+    tdb = TaskDB()
+    tdb.load_tasks("data/tasks/nlpprogress.json")
+    tdb.load_synonyms("data/tasks/synonyms.csv")
+
+    task = tdb.get_task("Semantic parsing").subtasks[0]
+    assert tdb.get_task("Abstract Meaning Representation Parsing") is task
+    assert tdb.get_task("text-to-sql") is tdb.get_task("SQL parsing")
+
+
+@pytest.mark.parametrize(
+    "filename", ["data/tasks/nlp-progress.json", "data/tasks/squad.json"]
+)
+def test_load_tasks_fast(filename):
+    validated = TaskDB()
+    validated.load_tasks(filename, validate=True)
+    fast = TaskDB()
+    fast.load_tasks(filename)
+
+    assert fast.export() == validated.export()
+
+
+def test_load_tasks_invalid():
+    with pytest.raises(DataError):
+        TaskDB().load_tasks(data=[{"name": "Task"}])
+
+
+def test_load_tasks_validate_keeps_input():
+    data = [
+        {
+            "task": "Task",
+            "datasets": [
+                {
+                    "dataset": "Dataset",
+                    "subdatasets": [{"subdataset": "Subdataset"}],
+                }
+            ],
+        }
+    ]
+    expected = copy.deepcopy(data)
+    tdb = TaskDB()
+    tdb.load_tasks(data=data, validate=True)
+
+    assert data == expected
+    dataset = tdb.tasks["Task"].datasets[0]
+    assert dataset.name == "Dataset" and not dataset.is_subdataset
+    assert dataset.subdatasets[0].name == "Subdataset"
+    assert dataset.subdatasets[0].is_subdataset
+
+
+def test_load_tasks_shares_strings():
+    tdb = TaskDB()
+    tdb.load_tasks("data/tasks/squad.json")
+    rows = [
+        row
+        for task in tdb.tasks.values()
+        for dataset in task.datasets
+        for row in dataset.sota.rows
+    ]
+    assert not hasattr(rows[0], "__dict__")
+    metrics = {id(name) for row in rows for name in row.metrics}
+    assert len(metrics) == len({name for row in rows for name in row.metrics})
+
+
+@pytest.mark.parametrize("fmt", [Format.jsonl, Format.jsonl_gz])
+def test_lazy_taskdb(tmp_path, fmt):
+    tdb = TaskDB()
+    tdb.load_tasks("data/tasks/nlp-progress.json")
+    tdb.add_synonym(tdb.tasks["Summarization"], "Text Summarization")
+    filename = str(tmp_path / f"tasks.{fmt.value}")
+    serialization.dump(tdb, filename, fmt=fmt)
+
+    def same(name):
+        return tdb.schema.dump(lazy.get_task(name)) == tdb.schema.dump(
+            tdb.get_task(name)
+        )
+
+    lazy = LazyTaskDB(filename)
+    assert lazy.task_names == list(tdb.tasks)
+    assert lazy.tasks == {}
+    assert same("Summarization")
+    assert list(lazy.tasks) == ["Summarization"]
+    # sub-tasks and synonyms, exact or case-folded, load their top-level task
+    for name in ["Dialogue State Tracking", "text summarization"]:
+        assert same(name)
+    assert list(lazy.tasks) == ["Summarization", "Dialogue"]
+    assert lazy.get_task("Unknown") is None
+
+    # an added task replaces the one in the file
+    lazy.add_task(Task(name="Machine Translation"))
+    assert lazy.get_task("Machine Translation").datasets == []
+    for name in ["Stance Detection", "Hypernym Discovery"]:
+        assert lazy.remove_task(name).name == name
+        assert lazy.get_task(name) is None
+
+    lazy.load_all()
+    tdb.remove_task("Stance Detection")
+    tdb.remove_task("Hypernym Discovery")
+    tdb.add_task(Task(name="Machine Translation"))
+    assert sorted(lazy.tasks) == sorted(tdb.tasks)
+    assert all(same(name) for name in tdb.tasks)
+
+
+def test_lazy_taskdb_stale_index(tmp_path):
+    tdb = TaskDB()
+    tdb.load_tasks("data/tasks/squad.json")
+    filename = str(tmp_path / "tasks.jsonl")
+    serialization.dump(tdb, filename, fmt=Format.jsonl)
+    with open(filename, "a") as fp:
+        fp.write("\n")
+
+    with pytest.raises(DataError):
+        LazyTaskDB(filename)
+
+
+def test_lazy_taskdb_all_tasks(tmp_path):
+    tdb = TaskDB()
+    tdb.load_tasks("data/tasks/nlp-progress.json")
+    filename = str(tmp_path / "tasks.jsonl")
+    serialization.dump(tdb, filename, fmt=Format.jsonl)
+
+    def lazy():
+        lazy = LazyTaskDB(filename)
+        lazy.get_task("Summarization")
+        return lazy
+
+    # the methods going over all the tasks load the ones not loaded yet
+    assert len(lazy().tasks_with_sota()) == len(tdb.tasks_with_sota())
+    assert len(lazy().datasets_with_sota()) == len(tdb.datasets_with_sota())
+
+    # the loaded tasks come first
+    def by_name(tasks):
+        return sorted(tasks, key=lambda task: task["task"])
+
+    assert by_name(lazy().export()) == by_name(tdb.export())
+    output = str(tmp_path / "tasks.json")
+    serialization.dump(lazy(), output)
+    assert by_name(serialization.load(output)) == by_name(tdb.export())